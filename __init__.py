@@ -1,13 +1,35 @@
+# blender runs this file again when scripts are reloaded, the modules of
+# the add-on are only reloaded then, not on the first import
+if "bpy" in locals():
+    import importlib
+    importlib.reload(update_scheduler)
+    importlib.reload(object_bounds)
+    importlib.reload(aligning_tools)
+    importlib.reload(glyph_layout)
+    importlib.reload(glyph_metrics)
+    importlib.reload(font_library)
+    importlib.reload(word_objects)
+    importlib.reload(font_import)
+    importlib.reload(font_previews)
+    importlib.reload(font_catalog)
+    importlib.reload(preview_renderer)
+else:
+    from . import update_scheduler
+    from . import object_bounds
+    from . import aligning_tools
+    from . import glyph_layout
+    from . import glyph_metrics
+    from . import font_library
+    from . import word_objects
+    from . import font_import
+    from . import font_previews
+    from . import font_catalog
+    from . import preview_renderer
+
 import bpy
 import bpy.utils.previews
-import addon_utils
 import os
 import shutil
-from . import aligning_tools
-import importlib
-from mathutils import Euler, Vector
-
-importlib.reload(aligning_tools)
 
 bl_info = {
     "name": "fontz",
@@ -20,6 +42,31 @@ bl_info = {
 }
 
 
+# (catalog revision, enum items), blender needs the returned list to stay alive
+_font_items = [None, []]
+
+
+def font_items(self, context):
+    """Items of the font selectors, built again only when the catalog changed.
+
+    Item numbers are kept by the catalog for every font, so the selected font
+    stays selected when other fonts are added or removed.
+    """
+
+    if _font_items[0] != catalog.revision:
+        _font_items[1] = [(k, k.capitalize(), 'Font name', "", catalog.number(k))
+                          for k in catalog.names()]
+        _font_items[0] = catalog.revision
+    return _font_items[1]
+
+
+def refresh_font_list():
+    """Shows catalog changes without reloading the add-on, icons of unchanged fonts stay loaded"""
+
+    preview_cache.set_sources(catalog.previews())
+    font_previews.tag_redraw()
+
+
 class GenerateStyle(bpy.types.Operator):
     """Operator that generates the 3D characters"""
 
@@ -33,64 +80,71 @@ class GenerateStyle(bpy.types.Operator):
     def execute(self, context):
         """Reads user typed text, selects letter models from selected font and place them in viewport"""
 
-        # the folder where all font files are stored
-        prefab_dir = os.path.join(os.path.split(os.path.realpath(__file__))[
-                                  0], "styles")
-
         # get user selected font
         font_name = context.scene.styled_font
+        if font_name not in catalog:
+            return {"FINISHED"}
 
         # font files are named with this convension: <font name>.blend
-        file_path = os.path.join(prefab_dir, f'{font_name}.blend')
+        file_path = catalog.font_path(font_name)
 
-        # get what the user inputed
-        text = context.scene.styled_text
-        letters = set(text)
+        # get what the user inputed, a text block is used for multi-line text
+        if context.scene.styled_text_block is not None:
+            text = context.scene.styled_text_block.as_string()
+        else:
+            text = context.scene.styled_text
+        letters = set(text) - {'\n'}
 
         if not os.path.exists(file_path):
             return {"FINISHED"}
 
-        # load only letters found in text for performance
-        with bpy.data.libraries.load(file_path) as (data_from, data_to):
-            data_to.objects = []
-
-            # go through the letters we need to load
-            for letter in letters:
-                # case 1 - already loaded
-                if bpy.data.objects.get(f'{letter}-{font_name}'):
-                    continue
-
-                # case 2 - not loaded yet
-                # find the letter object and load it
-                for object_name in data_from.objects:
-                    if object_name == f'{letter}-{font_name}':
-                        data_to.objects.append(object_name)
-                        break
-
-        # collection to house letters
-        word = bpy.data.collections.new(text)
-
-        # Add collection to scene collection
-        bpy.context.scene.collection.children.link(word)
+        # load only letters found in text that are not loaded yet,
+        # the font file is not opened at all when every letter is loaded
+        appended = font_library.library.ensure_glyphs(
+            file_path, font_name, letters)
+        self.report({'INFO'}, f'Loaded {appended} glyphs from {font_name}.blend '
+                    f'(glyph cache: {font_library.library.hits} hits, '
+                    f'{font_library.library.misses} misses)')
 
         spacing = context.scene.spacing
-        pos = 0
-        # for each letter in text we first copy loaded object
-        # then place it next to last letter
-        # obj - is the original character model loaded from font file
-        # pos - keeps track of x-axis position of letter
-        for letter in text:
-            obj = bpy.data.objects.get(f'{letter}-{font_name}')
-            if obj:
-                new_obj = obj.copy()
-                new_obj.data = obj.data.copy()
-                new_obj.location = (0, 0, 0)
-
-                word.objects.link(new_obj)
-                bpy.ops.object.select_all(action='DESELECT')
-                new_obj.select_set(True)
-                bpy.ops.transform.translate(value=(pos, 0, 0))
-                pos += new_obj.dimensions.x + spacing
+        linked = context.scene.link_glyphs
+
+        # advance widths and kerning pairs come from the font's metrics
+        # sidecar, which is written once if the font does not have one yet
+        metrics = glyph_metrics.ensure_metrics(file_path, font_name)
+        table = glyph_layout.layout_table(metrics)
+
+        # glyphs are the original character models loaded from font file
+        glyphs = {letter: bpy.data.objects.get(f'{letter}-{font_name}')
+                  for letter in letters}
+
+        # position of every letter is known before any object is created,
+        # each letter is placed by writing its location once
+        layout = glyph_layout.text_layout(
+            table, spacing, context.scene.use_kerning,
+            context.scene.max_line_width, context.scene.line_height,
+            context.scene.text_align)
+        indices, xs, vs = layout.layout(text)
+        placement = (indices.tolist(), xs.tolist(), vs.tolist(),
+                     table.vertical_axis)
+
+        # in update mode the collection of the active letter is changed in
+        # place, only the edited characters get new objects
+        word = None
+        if context.scene.update_existing:
+            word = word_objects.find_word(context.active_object)
+
+        if word is not None:
+            added, removed = word_objects.update_word(
+                word, text, font_name, glyphs, placement, linked)
+            self.report({'INFO'}, f'Updated {word.name}: '
+                        f'{added} letters added, {removed} removed')
+        else:
+            word = word_objects.build_word(
+                text, font_name, glyphs, placement, linked)
+
+            # Add collection to scene collection
+            bpy.context.scene.collection.children.link(word)
 
         return {"FINISHED"}
 
@@ -102,43 +156,103 @@ class GenerateStyle(bpy.types.Operator):
         styled_font - the name of selected font
         styled_text - the user inputed text
         spacing - amount of spacing between letters
+        link_glyphs - share one mesh per glyph instead of copying it for every letter
+        use_kerning - apply the kerning pairs of the font
+        styled_text_block - text block used instead of styled_text for multi-line text
+        max_line_width - width lines are wrapped at, 0 disables wrapping
+        line_height - distance between lines relative to the font height
+        text_align - justification of lines
+        update_existing - change the collection of the active letter instead of adding a new one
         """
-        fonts = []
-
-        i = 1
-        for k, v in sorted(previews.items()):
-            fonts.append((k, k.capitalize(), 'Font name', "", i))
-            i += 1
-
         bpy.types.Scene.styled_font = bpy.props.EnumProperty(
-            items=fonts, name='Choose Font'
+            items=font_items, name='Choose Font'
         )
 
         bpy.types.Scene.styled_text = bpy.props.StringProperty(
             name="Text",
             description="Input text")
 
-        def distribute(self, context):
-            collection = context.selected_objects[0].users_collection
-            if not len(collection):
-                return
+        bpy.types.Scene.styled_text_block = bpy.props.PointerProperty(
+            type=bpy.types.Text,
+            name="Text block",
+            description="Text block with multi-line text, used instead of the text field when set")
+
+        bpy.types.Scene.max_line_width = bpy.props.FloatProperty(
+            name="Line width",
+            description="Wrap lines longer than this at spaces, 0 disables wrapping",
+            default=0.0,
+            min=0.0,
+            precision=2)
+
+        bpy.types.Scene.line_height = bpy.props.FloatProperty(
+            name="Line height",
+            description="Distance between lines relative to the font height",
+            default=1.2,
+            min=0.1,
+            max=10.0,
+            precision=2)
+
+        bpy.types.Scene.text_align = bpy.props.EnumProperty(
+            items=(("LEFT", "Left", "Align lines to the left", "ALIGN_LEFT", 0),
+                   ("CENTER", "Center", "Center lines", "ALIGN_CENTER", 1),
+                   ("RIGHT", "Right", "Align lines to the right", "ALIGN_RIGHT", 2)),
+            name="Justification",
+            description="Justification of lines")
+
+        bpy.types.Scene.update_existing = bpy.props.BoolProperty(
+            name="Update existing",
+            description="Change the text of the active letter's collection instead of adding a new one, "
+                        "keeping letters that did not change",
+            default=False)
+
+        bpy.types.Scene.link_glyphs = bpy.props.BoolProperty(
+            name="Link glyphs",
+            description="Share one mesh between all copies of a letter instead of copying it",
+            default=True)
+
+        bpy.types.Scene.use_kerning = bpy.props.BoolProperty(
+            name="Kerning",
+            description="Adjust spacing between letter pairs to the shape of the letters",
+            default=True)
 
-            objects = collection[0].all_objects
-            if not len(objects):
+        def distribute(self, context):
+            if not context.selected_objects:
                 return
 
-            spacing = context.scene.spacing
-
-            init_pos = objects[0].location
-            final_pos = objects[-1].location
-
-            direction = (Vector(final_pos) -
-                         Vector(init_pos))
-            direction.normalize()
-            direction = spacing * direction
-            for pos, obj in enumerate(objects):
-                obj.location = init_pos + pos * direction
-                # bpy.ops.transform.translate(value=direction)
+            # remember what was selected when the slider moved, spacing is
+            # applied later from a timer at a limited rate
+            scene_name = self.name
+            obj_name = context.selected_objects[0].name
+
+            def apply(final):
+                scn = bpy.data.scenes.get(scene_name)
+                obj = bpy.data.objects.get(obj_name)
+                if scn is None or obj is None:
+                    return
+
+                # generated collections are laid out again from the font's
+                # metrics, others are spread evenly between their ends
+                word = word_objects.find_word(obj)
+                if word is not None:
+                    metrics = catalog.metrics(word[word_objects.FONT_KEY])
+
+                    if metrics is not None:
+                        layout = glyph_layout.text_layout(
+                            glyph_layout.layout_table(metrics), scn.spacing,
+                            scn.use_kerning, scn.max_line_width, scn.line_height,
+                            scn.text_align)
+                        word_objects.place_word(word, layout)
+                        return
+
+                collection = obj.users_collection
+                if not len(collection):
+                    return
+
+                word_objects.space_evenly(
+                    collection[0].all_objects, scn.spacing)
+
+            # the settled spacing becomes one undo step
+            update_scheduler.scheduler.request('spacing', apply, undo="Letter Spacing")
 
         bpy.types.Scene.spacing = bpy.props.FloatProperty(
             name="Spacing",
@@ -152,11 +266,45 @@ class GenerateStyle(bpy.types.Operator):
     @classmethod
     def unregister(cls):
         """Remove registered properties."""
+        update_scheduler.scheduler.cancel()
+
+        del bpy.types.Scene.link_glyphs
+        del bpy.types.Scene.use_kerning
+        del bpy.types.Scene.styled_text_block
+        del bpy.types.Scene.max_line_width
+        del bpy.types.Scene.line_height
+        del bpy.types.Scene.text_align
+        del bpy.types.Scene.update_existing
+
         del bpy.context.scene.styled_text
         del bpy.context.scene.styled_font
         del bpy.context.scene.spacing
 
 
+class MakeGlyphSingleUser(bpy.types.Operator):
+    """Gives selected letters their own copy of a shared glyph mesh so they can be edited"""
+
+    bl_idname = "object.make_glyph_single_user"
+    bl_label = "Make Single User"
+    bl_description = "Give selected letters their own mesh so they can be edited without affecting other letters"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.selected_objects) > 0
+
+    def execute(self, context):
+        """Copies the mesh of every selected letter that shares its mesh with other objects"""
+
+        # copy each shared mesh once per selected user, letters that already
+        # own their mesh are left alone
+        for obj in context.selected_objects:
+            if obj.data is not None and obj.data.users > 1:
+                obj.data = obj.data.copy()
+
+        return {"FINISHED"}
+
+
 class PreprocessFontFile(bpy.types.Operator):
     """Operator to prepare new font files for loading. Renames objects so that our loader finds the letter models."""
 
@@ -181,6 +329,9 @@ class PreprocessFontFile(bpy.types.Operator):
             if len(obj.name) == 1:
                 obj.name = f'{obj.name}-{new_font}'
 
+        # the renamed file is saved afterwards, so its glyph metrics are
+        # measured when the font is imported
+
         return {"FINISHED"}
 
     @classmethod
@@ -209,42 +360,46 @@ class FontRemover(bpy.types.Operator):
     def execute(self, context):
         """Deletes the preview and font file specified in delete_font propery."""
 
-        # directory where font files are located
-        prefab_dir = os.path.join(os.path.split(os.path.realpath(__file__))[
-            0], "styles")
-
-        # directory where font preview images are located
-        preview_dir = os.path.join(os.path.split(os.path.realpath(__file__))[
-            0], "previews")
-
         scn = context.scene
+        if scn.delete_font not in catalog:
+            return {"FINISHED"}
 
-        font_file = os.path.join(prefab_dir, f'{scn.delete_font}.blend')
+        font_file = catalog.font_path(scn.delete_font)
 
-        # find preview file that belongs to the font in the preview folder
+        # preview file that belongs to the font
         # preview files are named as such:
         # <font name>.ext where ext is any valid image extension
-        preview_file = None
-        for file in os.listdir(preview_dir):
-            if scn.delete_font == os.path.splitext(file)[0]:
-                preview_file = os.path.join(preview_dir, file)
-                break
-
-        # check if preview file exists and delete both the preview and font file,
-        # preview image should exist unless the blender add-on folder is tampered with,
-        # in that case we do nothing
-        if preview_file:
-            try:
-                os.remove(preview_file)
+        preview_file = catalog.preview_path(scn.delete_font)
+
+        # the font and its metrics are deleted even when the preview is missing,
+        # a font imported without a preview has none to delete
+        try:
+            if os.path.exists(font_file):
                 os.remove(font_file)
 
-                # reload script to update our font list
-                addon_utils.disable(__name__)
-                bpy.ops.script.reload()
-                addon_utils.enable(__name__)
+            metrics_file = glyph_metrics.metrics_path(font_file)
+            if os.path.exists(metrics_file):
+                os.remove(metrics_file)
 
-            except Exception as e:
-                print(e)
+            if preview_file and os.path.exists(preview_file):
+                os.remove(preview_file)
+
+            font_library.library.forget(font_file)
+
+            manifest = import_manifest()
+            manifest.forget(font_file)
+            if preview_file:
+                manifest.forget(preview_file)
+            manifest.save()
+
+            preview_cache.forget(scn.delete_font)
+            catalog.remove(scn.delete_font)
+
+            # the font lists read the catalog, only the panels are redrawn
+            refresh_font_list()
+
+        except Exception as e:
+            print(e)
 
         return {"FINISHED"}
 
@@ -252,15 +407,8 @@ class FontRemover(bpy.types.Operator):
     def register(cls):
         "Register font selector dropdown used for deletion"
 
-        fonts = []
-
-        i = 1
-        for k, v in sorted(previews.items()):
-            fonts.append((k, k.capitalize(), 'Font name', "", i))
-            i += 1
-
         bpy.types.Scene.delete_font = bpy.props.EnumProperty(
-            items=fonts, name='Font name'
+            items=font_items, name='Font name'
         )
 
     @classmethod
@@ -268,6 +416,21 @@ class FontRemover(bpy.types.Operator):
         del bpy.context.scene.delete_font
 
 
+class RescanFonts(bpy.types.Operator):
+    """Builds the font catalog again from the font and preview folders"""
+
+    bl_idname = "object.rescan_fonts"
+    bl_label = "Rescan Fonts"
+    bl_description = "Look for fonts added to or removed from the add-on folders by hand"
+
+    def execute(self, context):
+        catalog.rescan()
+        context.scene.loader_message = f"{len(catalog)} fonts found"
+        refresh_font_list()
+
+        return {"FINISHED"}
+
+
 class FontFileLoader(bpy.types.Operator):
     """Adds new font to our font list."""
 
@@ -275,29 +438,23 @@ class FontFileLoader(bpy.types.Operator):
     bl_label = "Load Font File"
     bl_description = "Load font file"
 
+    # font_import.BackgroundImport that is running, if any
+    job = None
+
+    # timer rendering previews or measuring the fonts of a finished import, if any
+    timer = None
+
     @classmethod
     def poll(cls, context):
         return True
 
     def link_font_preview(self, path):
-        """Returns zip containing a font file and respective preview image file
+        """Returns font_import.FontSource of every font file under path and its preview image
 
         path - the directory path to look for font file and respective preview file
         """
 
-        font = []
-        image = []
-
-        for file in os.listdir(path):
-            if file.endswith('.blend'):
-                font_name = os.path.splitext(file)[0]
-                for p in os.listdir(path):
-                    if p != file and os.path.splitext(p)[0] == (font_name):
-                        font.append(file)
-                        image.append(p)
-                        break
-
-        return zip(font, image)
+        return font_import.scan_fonts(path)
 
     def execute(self, context):
         """Looks for .blend file (font files) in given directory and their respective preview files.
@@ -312,49 +469,205 @@ class FontFileLoader(bpy.types.Operator):
 
             return {"FINISHED"}
 
-        # our internal directory used to store all available font files
-        prefab_dir = os.path.join(os.path.split(os.path.realpath(__file__))[
-            0], "styles")
+        scene_name = context.scene.name
+        background = context.scene.import_in_background
+        sources = self.link_font_preview(font_dir)
+
+        # fonts without a preview get one rendered into the add-on's data
+        # folder, the font folder is left as it is
+        missing = []
+        if context.scene.render_missing_previews:
+            missing = [source.font for source in sources if source.preview is None]
+
+        FontFileLoader.stop_timer()
+        if not missing or not background:
+            if missing:
+                preview_renderer.render_missing(missing, rendered_dir)
+            FontFileLoader.start_import(scene_name, sources, background, bool(missing))
+            return {"FINISHED"}
+
+        # a preview takes a moment to render, one is rendered per timer tick
+        # and the import starts after the last one
+        todo = list(missing)
+
+        def render():
+            scene = bpy.data.scenes.get(scene_name)
+            if todo:
+                preview_renderer.render_one(todo.pop(0), rendered_dir)
+                if scene is not None:
+                    scene.loader_message = \
+                        f"Rendering previews {len(missing) - len(todo)}/{len(missing)}"
+                return 0
+
+            FontFileLoader.timer = None
+            FontFileLoader.start_import(scene_name, sources, True, True)
+            return None
+
+        context.scene.loader_message = f"Rendering previews 0/{len(missing)}"
+        FontFileLoader.timer = render
+        bpy.app.timers.register(render, first_interval=0)
+        return {"FINISHED"}
 
-        # our internal directory used to store all available font preview images
-        preview_dir = os.path.join(os.path.split(os.path.realpath(__file__))[
-            0], "previews")
+    @staticmethod
+    def start_import(scene_name, sources, background, rendered=False):
+        """Copies the fonts that have a preview into the add-on.
 
-        print("?>>>>", [i for i in self.link_font_preview(font_dir)])
-        for font_file_name, image_file_name in self.link_font_preview(font_dir):
-            # convert the file name to full path
-            filepath = os.path.join(font_dir, font_file_name)
-            imagepath = os.path.join(font_dir, image_file_name)
+        scene_name - scene the progress is shown in
+        sources - font_import.FontSource of the fonts to import
+        background - copy files in worker threads and finish from a timer
+        rendered - pair fonts without a preview with the one rendered for them
+        """
 
-            # copy the font files to our prefab directory
-            try:
-                new_font_path = os.path.join(prefab_dir, font_file_name)
+        # our internal directories used to store all available font files and previews
+        prefab_dir = catalog.prefab_dir
+        preview_dir = catalog.previews_dir
+
+        # only fonts and previews that are new or changed are copied
+        manifest = import_manifest()
+
+        report = font_import.ImportReport()
+        pairs = []
+        for source in sources:
+            preview = source.preview
+            if preview is None and rendered:
+                preview = preview_renderer.existing_preview(source.font, rendered_dir)
+
+            if preview is None:
+                report.unpaired.append(source.name)
+            else:
+                pairs.append((source.font, preview))
+
+        if background:
+            FontFileLoader.cancel_job()
+
+            # files are copied by worker threads, a timer collects the results
+            # and reports progress until all fonts are done
+            job = font_import.BackgroundImport(pairs, manifest, prefab_dir, preview_dir, report)
+            FontFileLoader.job = job
+
+            def progress():
+                if FontFileLoader.job is not job:
+                    return None
+
+                scene = bpy.data.scenes.get(scene_name)
+                if not job.poll():
+                    if scene is not None:
+                        scene.loader_message = f"Importing fonts {job.done}/{job.total}"
+                    return 0.2
+
+                FontFileLoader.job = None
+                FontFileLoader.finish(scene_name, job.report, job.fonts, manifest)
+                return None
+
+            scene = bpy.data.scenes.get(scene_name)
+            if scene is not None:
+                scene.loader_message = f"Importing fonts 0/{job.total}"
+            bpy.app.timers.register(progress, first_interval=0.2)
+            return
+
+        report, copied = font_import.import_fonts(pairs, manifest, prefab_dir, preview_dir,
+                                                  report)
+        FontFileLoader.finish(scene_name, report, copied, manifest)
+
+    @staticmethod
+    def add_font(filepath, new_font_path, new_preview_path, manifest):
+        """Adds a copied font to the catalog with the metrics it was shipped with, if any,
+        returns its name. The catalog is saved by the caller."""
+
+        # a shipped sidecar older than its font was made before the glyphs
+        # last changed, the copy keeps its time so it is still judged by it
+        metrics_file = glyph_metrics.metrics_path(filepath)
+        if os.path.exists(metrics_file) and not glyph_metrics.is_stale(filepath):
+            shutil.copy2(metrics_file, glyph_metrics.metrics_path(new_font_path))
+        font_name = os.path.splitext(os.path.basename(new_font_path))[0]
+
+        catalog.add(font_name, new_font_path, new_preview_path,
+                    manifest.content_hash(new_font_path),
+                    manifest.content_hash(new_preview_path) if new_preview_path else None,
+                    save=False)
+
+        # a replaced preview keeps its path, its icon is loaded again
+        preview_cache.release(font_name)
+        return font_name
 
-                shutil.copyfile(filepath, new_font_path)
-            except Exception as e:
-                context.scene.loader_message = str(e)
+    @classmethod
+    def stop_timer(cls):
+        """Stops rendering previews or measuring imported fonts, unmeasured fonts get
+        their metrics when they are first used"""
 
-            # copy the preview file to our preview folder
-            try:
-                ext = os.path.splitext(imagepath)[1]
-                fontname = os.path.splitext(font_file_name)[0]
-                image_file_name = fontname + ext
-                new_image_path = os.path.join(preview_dir, image_file_name)
+        if cls.timer is not None and bpy.app.timers.is_registered(cls.timer):
+            bpy.app.timers.unregister(cls.timer)
+            # keeps the glyphs of the fonts measured so far
+            catalog.save()
+        cls.timer = None
 
-                shutil.copyfile(imagepath, new_image_path)
+    @classmethod
+    def cancel_job(cls):
+        """Stops a running import, fonts it already copied are added to the catalog"""
+
+        job = cls.job
+        cls.job = None
+        if job is None:
+            return
+
+        job.cancel()
+        for filepath, new_font_path, new_preview_path in job.fonts:
+            try:
+                cls.add_font(filepath, new_font_path, new_preview_path, job.manifest)
             except Exception as e:
-                context.scene.loader_message = str(e)
+                print(e)
+        catalog.save()
 
-        context.scene.loader_message = "Fonts added"
+    @staticmethod
+    def finish(scene_name, report, copied, manifest):
+        """Adds the copied fonts to the catalog and updates the font list once, then measures
+        fonts that came without metrics one per timer tick and reports the result"""
 
-        # reload the script to update the font list UI
-        try:
-            addon_utils.disable(__name__)
-            bpy.ops.script.reload()
-            addon_utils.enable(__name__)
-        except:
-            pass
-        return {"FINISHED"}
+        todo = []
+        for filepath, new_font_path, new_preview_path in copied:
+            try:
+                font_name = FontFileLoader.add_font(filepath, new_font_path, new_preview_path,
+                                                    manifest)
+                if glyph_metrics.is_stale(new_font_path):
+                    todo.append((font_name, new_font_path, new_preview_path))
+            except Exception as e:
+                report.errors.append((os.path.basename(filepath), str(e)))
+        catalog.save()
+
+        # the new fonts are listed right away, measuring only fills in their glyphs
+        if report.added or report.updated:
+            refresh_font_list()
+
+        total = len(todo)
+
+        def measure():
+            scene = bpy.data.scenes.get(scene_name)
+
+            # opening a font file to measure its glyphs takes a while,
+            # Blender redraws between fonts
+            if todo:
+                font_name, new_font_path, new_preview_path = todo.pop(0)
+                try:
+                    glyph_metrics.ensure_metrics(new_font_path, font_name)
+                    catalog.add(font_name, new_font_path, new_preview_path,
+                                manifest.content_hash(new_font_path),
+                                manifest.content_hash(new_preview_path)
+                                if new_preview_path else None, save=False)
+                except Exception as e:
+                    report.errors.append((os.path.basename(new_font_path), str(e)))
+
+                if scene is not None:
+                    scene.loader_message = f"Measuring fonts {total - len(todo)}/{total}"
+                return 0
+
+            FontFileLoader.timer = None
+            catalog.save()
+            if scene is not None:
+                scene.loader_message = report.summary()
+            return None
+
+        FontFileLoader.timer = measure
+        bpy.app.timers.register(measure, first_interval=0)
 
     @classmethod
     def register(cls):
@@ -375,13 +688,50 @@ class FontFileLoader(bpy.types.Operator):
             name="",
             description="Loader Message")
 
+        bpy.types.Scene.import_in_background = bpy.props.BoolProperty(
+            name="Import in background",
+            default=True,
+            description="Copy font files in background threads so Blender stays responsive")
+
+        bpy.types.Scene.render_missing_previews = bpy.props.BoolProperty(
+            name="Render missing previews",
+            default=False,
+            description="Render a preview for fonts that come without one instead of skipping them")
+
     @classmethod
     def unregister(cls):
+        cls.stop_timer()
+        cls.cancel_job()
+
+        del bpy.types.Scene.import_in_background
+        del bpy.types.Scene.render_missing_previews
         del bpy.context.scene.font_file_path
         # del bpy.context.scene.image_file_path
         del bpy.context.scene.loader_message
 
 
+# number of fonts drawn at once in the font grid
+FONTS_PER_PAGE = 12
+
+# (catalog revision, filter, names), the grid is drawn on every mouse move
+_filtered = [None, None, []]
+
+
+def filtered_fonts(text):
+    """Returns the sorted names of the fonts containing text, kept until the catalog or text changes"""
+
+    if _filtered[0] != catalog.revision or _filtered[1] != text:
+        needle = text.lower()
+        _filtered[2] = [k for k in catalog.names() if needle in k.lower()]
+        _filtered[0] = catalog.revision
+        _filtered[1] = text
+    return _filtered[2]
+
+
+def page_count(names):
+    return max(1, -(-len(names) // FONTS_PER_PAGE))
+
+
 class RNAD321_PT_FontPanel(bpy.types.Panel):
     """Font generation UI"""
 
@@ -396,29 +746,83 @@ class RNAD321_PT_FontPanel(bpy.types.Panel):
         lay = self.layout
 
         lay.prop(scn, 'styled_text')
+        lay.prop(scn, 'styled_text_block')
 
         row = lay.row()
         row.prop(scn, 'styled_font')
 
+        row = lay.row()
+        row.prop(scn, 'max_line_width')
+        row.prop(scn, 'line_height')
+        lay.row().prop(scn, 'text_align', expand=True)
+
+        row = lay.row()
+        row.prop(scn, 'use_kerning')
+        row.prop(scn, 'link_glyphs')
+        row.operator('object.make_glyph_single_user', text="Make Single User")
+
+        lay.prop(scn, 'update_existing')
+
         lay.operator('object.generate_style', text="Generate")
 
+        row = lay.row()
+        row.prop(scn, 'font_filter', text="", icon='VIEWZOOM')
+
+        # only the fonts of the current page are drawn
+        names = filtered_fonts(scn.font_filter)
+        pages = page_count(names)
+        # removing fonts can leave the page past the end until it is changed
+        page = min(scn.font_page, pages - 1)
+
+        row = lay.row()
+        row.prop(scn, 'font_page', text="Page")
+        row.label(text=f'of {pages}, {len(names)} fonts')
+
         grid = lay.grid_flow(columns=3, align=True)
 
         # populate the grid with previews,
         # group the name of font and preview image in single box
-        # previews is loaded during registration
-        # it contains loaded preview images
-        for k, v in sorted(previews.items()):
+        # icons are loaded the first time they are drawn, fonts whose
+        # thumbnail is still being made get a placeholder icon
+        for k in names[page * FONTS_PER_PAGE:(page + 1) * FONTS_PER_PAGE]:
             box = grid.box()
-            box.template_icon(icon_value=v[k].icon_id, scale=4)
-            box.label(text=f'{k.capitalize()}', icon_value=v[k].icon_id)
+            icon_id = preview_cache.icon_id(k)
+            if icon_id:
+                box.template_icon(icon_value=icon_id, scale=4)
+                box.label(text=f'{k.capitalize()}', icon_value=icon_id)
+            else:
+                box.label(text=f'{k.capitalize()}', icon='FILE_FONT')
 
     @classmethod
     def register(cls):
+        """Registers the name filter and page number of the font grid"""
+
+        def reset_page(self, context):
+            self.font_page = 0
+
+        def clamp_page(self, context):
+            last = page_count(filtered_fonts(self.font_filter)) - 1
+            if self.font_page > last:
+                self.font_page = last
+
+        bpy.types.Scene.font_filter = bpy.props.StringProperty(
+            name="Filter",
+            description="Only show fonts whose name contains this",
+            update=reset_page)
+
+        bpy.types.Scene.font_page = bpy.props.IntProperty(
+            name="Page",
+            description="Page of the font grid",
+            default=0,
+            min=0,
+            update=clamp_page)
+
         print('Registered class: %s' % cls.bl_label)
 
     @classmethod
     def unregister(cls):
+        del bpy.types.Scene.font_filter
+        del bpy.types.Scene.font_page
         print('Unregistered class: %s' % cls.bl_label)
 
 
@@ -458,10 +862,14 @@ class RNAD321_PT_FontFileLoader(bpy.types.Panel):
         lay.prop(context.scene, 'font_dir_path')
         # lay.prop(context.scene, 'image_file_path')
 
+        lay.prop(context.scene, 'import_in_background')
+        lay.prop(context.scene, 'render_missing_previews')
         lay.operator('object.load_fontfile', text='Add Fonts')
 
         lay.label(text=context.scene.loader_message)
 
+        lay.operator('object.rescan_fonts', text='Rescan Fonts')
+
         lay.separator()
 
         lay.label(text='Remove Font')
@@ -471,13 +879,32 @@ class RNAD321_PT_FontFileLoader(bpy.types.Panel):
         lay.operator('object.remove_fontfile', text='Delete Font')
 
 
-previews = {}
+# the catalog, import manifest and thumbnails are kept in blender's user
+# config folder, the add-on folder only holds fonts and previews
+data_dir = bpy.utils.user_resource('CONFIG', path="fontz", create=True)
+
+
+def import_manifest():
+    """Returns the records of imported fonts and previews"""
+
+    return font_import.ImportManifest(os.path.join(data_dir, "import_manifest.json"),
+                                      catalog.addon_dir)
+
+
+# every available font, loaded when registering
+catalog = font_catalog.FontCatalog(os.path.split(os.path.realpath(__file__))[0], data_dir)
+preview_cache = font_previews.PreviewCache(os.path.join(data_dir, "thumbnails"))
+# previews rendered for imported fonts that came without one
+rendered_dir = os.path.join(data_dir, "rendered_previews")
 classes = [GenerateStyle,
+           MakeGlyphSingleUser,
            PreprocessFontFile,
            FontFileLoader,
            FontRemover,
+           RescanFonts,
            RNAD321_PT_FontPanel,
            aligning_tools.RAND321_OBJECT_OT_align_tools,
+           aligning_tools.OBJECT_OT_align_to_active,
            aligning_tools.RAND321VIEW3D_PT_AlignUi,
            RNAD321_PT_PreprocessFontFile,
            RNAD321_PT_FontFileLoader]
@@ -485,14 +912,10 @@ classes = [GenerateStyle,
 
 def unregister():
     # remove previews
-    for pcoll in previews.values():
-        try:
-            print('removing')
-            bpy.utils.previews.remove(pcoll)
-            print('removing success')
-        except Exception as e:
-            print(e)
-    previews.clear()
+    try:
+        preview_cache.close()
+    except Exception as e:
+        print(e)
 
     # unregister classes
     for cls in classes:
@@ -510,31 +933,11 @@ def register():
         print(e)
 
     try:
-        # prepare preview
-        pcoll = bpy.utils.previews.new()
-
-        # folder that contains all fonts
-        prefab_dir = os.path.join(os.path.split(os.path.realpath(__file__))[
-                                  0], "styles")
-
-        # folder that contains all preview images
-        previews_dir = os.path.join(os.path.split(os.path.realpath(__file__))[
-                                    0], "previews")
-
-        preview_files = []
-        for file in os.listdir(previews_dir):
-            fontname = os.path.splitext(file)[0]
-            if f'{fontname}.blend' in os.listdir(prefab_dir):
-                preview_files.append(file)
-
-        # load all files to blender preview and store them in preview dictionary for later use
-        for fname in preview_files:
-            # load image
-            pcoll.load(os.path.splitext(fname)[0], os.path.join(
-                previews_dir, fname), 'IMAGE')
-
-            # store reference in preview dict
-            previews[os.path.splitext(fname)[0]] = pcoll
+        # fonts are read from the catalog index, the folders are only
+        # listed if there is no index yet, icons are loaded from cached
+        # thumbnails the first time the panel draws them
+        catalog.load()
+        preview_cache.set_sources(catalog.previews())
 
     except Exception as e:
         print(e)
@@ -7,6 +7,7 @@ from bpy.types import (
 from bpy.props import (
     EnumProperty,
     BoolProperty,
+    BoolVectorProperty,
     FloatVectorProperty,
     StringProperty,
 )
@@ -14,89 +15,161 @@ from mathutils import (
     Vector,
     Matrix,
 )
+import numpy as np
+
+from . import object_bounds
+from . import update_scheduler
 
 
 # Simple Align Defs #
 
-# Align all
-def main(context):
-    for i in bpy.context.selected_objects:
-        i.matrix_world.translation = bpy.context.active_object.matrix_world.translation.copy()
-        i.rotation_euler = bpy.context.active_object.rotation_euler
+def _set_masked(objects, prop, target, mask, offset=None):
+    """Sets prop of every object to target on the axes in mask.
 
+    Values are read per object and compared together, only objects whose
+    value changes are written.
 
-# Align Location
-def LocAll(context):
-    for i in bpy.context.selected_objects:
-        i.matrix_world.translation = bpy.context.active_object.matrix_world.translation.copy()
+    offset - name of a property subtracted from target per object, e.g.
+    delta_location
+    """
 
+    current = np.array([tuple(getattr(obj, prop)) for obj in objects])
+    wanted = np.broadcast_to(target, current.shape)
+    if offset is not None:
+        wanted = wanted - np.array([tuple(getattr(obj, offset)) for obj in objects])
 
-def LocX(context):
-    for i in bpy.context.selected_objects:
-        i.matrix_world.translation.x = bpy.context.active_object.matrix_world.translation.x
+    new = np.where(mask, wanted, current)
+    for i in np.nonzero((new != current).any(axis=1))[0].tolist():
+        setattr(objects[i], prop, new[i].tolist())
 
 
-def LocY(context):
-    for i in bpy.context.selected_objects:
-        i.matrix_world.translation.y = bpy.context.active_object.matrix_world.translation.y
+def align_to_active(objects, active, location=(False, False, False),
+                    rotation=(False, False, False), scale=(False, False, False)):
+    """Copies location, rotation and scale of active to objects on the axes enabled in the masks.
 
+    Locations are matched in world space, rotations and scales are copied
+    as they are. The reference is read from active once and the new values
+    of all objects are computed together.
 
-def LocZ(context):
-    for i in bpy.context.selected_objects:
-        i.matrix_world.translation.z = bpy.context.active_object.matrix_world.translation.z
+    location, rotation, scale - (x, y, z) axis masks
+    """
 
+    objects = [obj for obj in objects if obj != active]
+    if not objects:
+        return
 
-# Align Rotation
-def RotAll(context):
-    for i in bpy.context.selected_objects:
-        i.rotation_euler = bpy.context.active_object.rotation_euler
+    location = np.array(location, dtype=bool)
+    if location.any():
+        target = np.array(active.matrix_world.translation)
 
+        # the location of an object without parent is its world location
+        # minus its delta, others go through their world matrix
+        free = [obj for obj in objects if obj.parent is None]
+        if free:
+            _set_masked(free, 'location', target, location, 'delta_location')
 
-def RotX(context):
-    for i in bpy.context.selected_objects:
-        i.rotation_euler.x = bpy.context.active_object.rotation_euler.x
+        for obj in objects:
+            if obj.parent is not None:
+                mtx = obj.matrix_world.copy()
+                for axis in np.nonzero(location)[0].tolist():
+                    mtx.translation[axis] = target[axis]
+                obj.matrix_world = mtx
 
+    rotation = np.array(rotation, dtype=bool)
+    if rotation.any():
+        _set_masked(objects, 'rotation_euler',
+                    np.array(active.rotation_euler), rotation)
 
-def RotY(context):
-    for i in bpy.context.selected_objects:
-        i.rotation_euler.y = bpy.context.active_object.rotation_euler.y
+    scale = np.array(scale, dtype=bool)
+    if scale.any():
+        _set_masked(objects, 'scale', np.array(active.scale), scale)
 
 
-def RotZ(context):
-    for i in bpy.context.selected_objects:
-        i.rotation_euler.z = bpy.context.active_object.rotation_euler.z
+# Advanced Align Defs #
 
+# object types whose pivot can be moved without moving their geometry
+PIVOT_TYPES = {'MESH', 'CURVE', 'SURFACE', 'FONT'}
 
-# Align Scale
-def ScaleAll(context):
-    for i in bpy.context.selected_objects:
-        i.scale = bpy.context.active_object.scale
 
+def shift_data(data, obj_type, local):
+    """Moves the geometry of a data block by a vector in its local space"""
 
-def ScaleX(context):
-    for i in bpy.context.selected_objects:
-        i.scale.x = bpy.context.active_object.scale.x
+    if obj_type == 'FONT':
+        # text is moved through its offset, which is measured in font size
+        data.offset_x += local[0] / data.size
+        data.offset_y += local[1] / data.size
+    else:
+        data.transform(Matrix.Translation(local))
 
+    object_bounds.invalidate(data)
 
-def ScaleY(context):
-    for i in bpy.context.selected_objects:
-        i.scale.y = bpy.context.active_object.scale.y
 
+def move_pivots(moves):
+    """Moves the pivots of objects while their geometry stays in place.
 
-def ScaleZ(context):
-    for i in bpy.context.selected_objects:
-        i.scale.z = bpy.context.active_object.scale.z
+    moves - list of (object, world space displacement of its pivot)
 
+    Every data block is transformed once, by the first object in moves that
+    uses it, with the combined displacement of all enabled axes. All other
+    objects using the same data, selected or not, are moved by the same
+    local offset so that their geometry does not move either.
+    """
+
+    users = None
+    done = set()
+
+    for obj, offset in moves:
+        data = obj.data
+        if data is None or data.as_pointer() in done:
+            continue
+        done.add(data.as_pointer())
+
+        # the displacement expressed in the object's local space
+        local = -(obj.matrix_world.to_3x3().inverted_safe() @ offset)
+        if obj.type == 'FONT':
+            # text can only be offset within its plane
+            local[2] = 0
+        if not local.length:
+            continue
+
+        shift_data(data, obj.type, local)
+
+        # objects sharing the data, found once for the whole operation
+        if data.users > 1 and users is None:
+            users = {}
+            for o in bpy.data.objects:
+                if o.data is not None:
+                    users.setdefault(o.data.as_pointer(), []).append(o)
+
+        others = users.get(data.as_pointer(), [obj]) if users else [obj]
+        for o in others:
+            o.location -= o.matrix_world.to_3x3() @ local
 
-# Advanced Align Defs #
 
 # subject to object 0, 1 and 2 to pivot for cursor
 def align_function(subject, active_too, consistent, self_or_active, loc_x, loc_y, loc_z, ref1, ref2, loc_offset,
                    rot_x, rot_y, rot_z, rot_offset, scale_x, scale_y, scale_z, scale_offset,
-                   fit_x, fit_y, fit_z):
+                   fit_x, fit_y, fit_z, sel_obj=None, act_obj=None, exact_bounds=False,
+                   evaluated=False):
+
+    # selection can be passed in when there is no usable context, e.g. from a timer
+    if sel_obj is None:
+        sel_obj = bpy.context.selected_objects
+    if act_obj is None:
+        act_obj = bpy.context.active_object
+
+    # evaluated geometry is read from one depsgraph for the whole operation
+    depsgraph = None
+    if evaluated:
+        if hasattr(bpy.context, 'evaluated_depsgraph_get'):
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+        else:
+            depsgraph = bpy.context.depsgraph
 
-    sel_obj = bpy.context.selected_objects
-    act_obj = bpy.context.active_object
+    # types whose bounds can be measured, others are aligned by their pivot
+    measured_types = {'MESH', 'FONT', 'SURFACE'}
+    if depsgraph is not None:
+        measured_types.add('CURVE')
 
     global sel_max
     global sel_min
@@ -104,122 +177,22 @@ def align_function(subject, active_too, consistent, self_or_active, loc_x, loc_y
     global ref2_co
 
     def get_reference_points(obj, space):
-
-        me = obj.data
-        co_list = []
-        # let's get all the points coordinates
-        if space == "global":
-            ok = False
-            obj_mtx = obj.matrix_world
-            if obj.type == 'MESH' and len(me.vertices) > 0:
-                ok = True
-                for p in me.vertices:
-                    co_list.append((obj_mtx @ p.co))
-
-            elif obj.type == 'SURFACE' and len(me.splines) > 0:
-                ok = True
-                for s in me.splines:
-                    for p in s.points:
-                        co_list.append((obj_mtx @ p.co))
-            elif obj.type == 'FONT' and len(me.splines) > 0:
-                ok = True
-                for s in me.splines:
-                    for p in s.bezier_points:
-                        co_list.append((obj_mtx @ p.co))
-
-        elif space == "local":
-            ok = False
-            if obj.type == 'MESH' and len(me.vertices) > 0:
-                ok = True
-                for p in me.vertices:
-                    co_list.append(p.co)
-
-            elif obj.type == 'SURFACE' and len(me.splines) > 0:
-                ok = True
-                for s in me.splines:
-                    for p in s.points:
-                        co_list.append(p.co)
-            elif obj.type == 'FONT' and len(obj.data.splines) > 0:
-                ok = True
-                for s in me.splines:
-                    for p in s.bezier_points:
-                        co_list.append(p.co)
-
-        # if a valid point found
-        # proceed to calculate the extremes
-        if ok:
-            max_x = co_list[0][0]
-            min_x = co_list[0][0]
-            max_y = co_list[0][1]
-            min_y = co_list[0][1]
-            max_z = co_list[0][2]
-            min_z = co_list[0][2]
-
-            for v in co_list:
-                # the strings of the list compared with the smaller and more found
-                # in order to find the minor and major for each axis
-                act_x = v[0]
-                if act_x > max_x:
-                    max_x = act_x
-                if act_x < min_x:
-                    min_x = act_x
-
-                act_y = v[1]
-                if act_y > max_y:
-                    max_y = act_y
-                if act_y < min_y:
-                    min_y = act_y
-
-                act_z = v[2]
-                if act_z > max_z:
-                    max_z = act_z
-                if act_z < min_z:
-                    min_z = act_z
-
-        else:
-            # otherwise use the pivot object
-            a = obj.matrix_world.translation
-            min_x = a[0]
-            max_x = a[0]
-            min_y = a[1]
-            max_y = a[1]
-            min_z = a[2]
-            max_z = a[2]
-
-        center_x = min_x + ((max_x - min_x) / 2)
-        center_y = min_y + ((max_y - min_y) / 2)
-        center_z = min_z + ((max_z - min_z) / 2)
-
-        reference_points = [min_x, center_x, max_x, min_y,
-                            center_y, max_y, min_z, center_z, max_z]
-        return reference_points
-
-    def get_sel_ref(ref_co, sel_obj):  # I look for the selection end points
-
-        sel_min = ref_co.copy()
-        sel_max = ref_co.copy()
-
-        for obj in sel_obj:
-            if obj != act_obj or (active_too and obj == act_obj):
-
-                ref_points = get_reference_points(obj, "global")
-                ref_min = Vector([ref_points[0], ref_points[3], ref_points[6]])
-                ref_max = Vector([ref_points[2], ref_points[5], ref_points[8]])
-
-                if ref_min[0] < sel_min[0]:
-                    sel_min[0] = ref_min[0]
-                if ref_max[0] > sel_max[0]:
-                    sel_max[0] = ref_max[0]
-                if ref_min[1] < sel_min[1]:
-                    sel_min[1] = ref_min[1]
-                if ref_max[1] > sel_max[1]:
-                    sel_max[1] = ref_max[1]
-                if ref_min[2] < sel_min[2]:
-                    sel_min[2] = ref_min[2]
-                if ref_max[2] > sel_max[2]:
-                    sel_max[2] = ref_max[2]
-
-        return sel_min, sel_max
+        # min, center and max of every axis, read in bulk with numpy and
+        # cached until the object's data changes, world bounds come from the
+        # cached local box unless exact bounds are asked for, in evaluated
+        # mode modifiers are taken into account
+        return object_bounds.cached_reference_points(obj, space, exact_bounds, depsgraph)
+
+    def selection_extent():
+        # min and max of the objects that move, from an index of their boxes
+        # that is reused while the selection stays the same
+        index = object_bounds.selection_index(
+            [obj for obj in sel_obj if obj != act_obj or active_too],
+            exact_bounds, depsgraph)
+        extent = index.extent()
+        if extent is None:
+            return index, None, None
+        return index, Vector(extent[0]), Vector(extent[1])
 
     def find_ref2_co(act_obj):
         # It contains the coordinates of the reference point for the positioning
@@ -318,71 +291,16 @@ def align_function(subject, active_too, consistent, self_or_active, loc_x, loc_y
             dim = ref_points[8] - ref_points[6]
             obj.scale[2] = (ref_dim[2] / dim) * act_obj.scale[2]
 
-    def move_pivot(obj):
-        me = obj.data
-        vec_ref2_co = Vector(ref2_co)
-        offset = vec_ref2_co - obj.location
-        offset_x = [offset[0] + loc_offset[0], 0, 0]
-        offset_y = [0, offset[1] + loc_offset[1], 0]
-        offset_z = [0, 0, offset[2] + loc_offset[2]]
-
-        def movement(vec):
-            obj_mtx = obj.matrix_world.copy()
-            # What's the displacement vector for the pivot?
-            move_pivot = Vector(vec)
-
-            # Move the pivot point (which is the object's location)
-            pivot = obj.location
-            pivot += move_pivot
-
-            nm = obj_mtx.inverted() @ Matrix.Translation(-move_pivot) @ obj_mtx
-
-            # Transform the mesh now
-            me.transform(nm)
-
-        if loc_x:
-            movement(offset_x)
-        if loc_y:
-            movement(offset_y)
-        if loc_z:
-            movement(offset_z)
-
-    def point_in_selection(act_obj, sel_obj):
-        ok = False
-        for o in sel_obj:
-            if o != act_obj:
-                ref_ob = o
-                obj_mtx = o.matrix_world
-                if o.type == 'MESH' and len(o.data.vertices) > 0:
-                    ref_co = o.data.vertices[0].co.copy()
-                    ref_co = obj_mtx @ ref_co
-                    ok = True
-                    break
-                elif o.type == 'CURVE' and len(o.data.splines) > 0:
-                    ref_co = o.data.splines[0].bezier_point[0].co.copy()
-                    ref_co = obj_mtx @ ref_co
-                    ok = True
-                    break
-                elif o.type == 'SURFACE' and len(o.data.splines) > 0:
-                    ref_co = o.data.splines[0].points[0].co.copy()
-                    ref_co = obj_mtx @ ref_co
-                    ok = True
-                    break
-                elif o.type == 'FONT' and len(o.data.splines) > 0:
-                    ref_co = o.data.splines[0].bezier_points[0].co.copy()
-                    ref_co = obj_mtx @ ref_co
-                    ok = True
-                    break
-        # if no object had data, use the position of an object that was not active as an internal
-        # point of selection
-        if ok is False:
-            ref_co = ref_ob.matrix_world.translation
-
-        return ref_co
+    def pivot_offset(obj):
+        # world space displacement of the pivot on the enabled axes
+        offset = Vector(ref2_co) - obj.location + Vector(loc_offset)
+        return Vector((offset[0] if loc_x else 0,
+                       offset[1] if loc_y else 0,
+                       offset[2] if loc_z else 0))
 
     if subject == "0":
         # if act_obj.type == ('MESH' or 'FONT' or 'CURVE' or 'SURFACE'):
-        if act_obj.type == 'MESH' or act_obj.type == 'FONT' or act_obj.type == 'SURFACE':
+        if act_obj.type in measured_types:
             ref2_co = find_ref2_co(act_obj)
         else:
             if ref2 == "4":
@@ -392,10 +310,9 @@ def align_function(subject, active_too, consistent, self_or_active, loc_x, loc_y
 
         # in the case of substantial selection
         if consistent:
-            # I am seeking a point that is in the selection space
-            ref_co = point_in_selection(act_obj, sel_obj)
-
-            sel_min, sel_max = get_sel_ref(ref_co, sel_obj)
+            index, sel_min, sel_max = selection_extent()
+            if sel_min is None:
+                return
 
             sel_center = sel_min + ((sel_max - sel_min) / 2)
             translate = [0, 0, 0]
@@ -419,18 +336,25 @@ def align_function(subject, active_too, consistent, self_or_active, loc_x, loc_y
                         obj.location[1] += translate[1]
                     if loc_z:
                         obj.location[2] += translate[2]
+
+            # the whole selection moved together, the index follows it
+            index.shift([translate[i] if enabled else 0
+                         for i, enabled in enumerate((loc_x, loc_y, loc_z))])
         else:  # not consistent
+            # dimensions of the active object are the same for every object
+            if fit_x or fit_y or fit_z:
+                dim = [0, 0, 0]
+                ref_points = get_reference_points(act_obj, "local")
+                dim[0] = ref_points[2] - ref_points[0]
+                dim[1] = ref_points[5] - ref_points[3]
+                dim[2] = ref_points[8] - ref_points[6]
+
             for obj in sel_obj:
                 if obj != act_obj:
                     if rot_x or rot_y or rot_z:
                         find_new_rotation(obj)
 
                     if fit_x or fit_y or fit_z:
-                        dim = [0, 0, 0]
-                        ref_points = get_reference_points(act_obj, "local")
-                        dim[0] = ref_points[2] - ref_points[0]
-                        dim[1] = ref_points[5] - ref_points[3]
-                        dim[2] = ref_points[8] - ref_points[6]
                         find_new_dimensions(obj, dim)
 
                     if scale_x or scale_y or scale_z:
@@ -450,26 +374,35 @@ def align_function(subject, active_too, consistent, self_or_active, loc_x, loc_y
                 # add dimensions if dim offset will be added
 
     elif subject == "1":
+        # offsets are collected first and applied together, so data shared
+        # by several objects is transformed once
+        moves = []
         if self_or_active == "1":
-            if act_obj.type == 'MESH':
+            if act_obj.type in measured_types:
                 ref2_co = find_ref2_co(act_obj)
+            elif ref2 == "4":
+                ref2_co = bpy.context.scene.cursor.location
+            else:
+                ref2_co = act_obj.matrix_world.translation
         for obj in sel_obj:
-            if self_or_active == "0":
-                ref2_co = find_ref2_co(obj)
             if loc_x or loc_y or loc_z:
-                if obj != act_obj and obj.type == 'MESH':
-                    move_pivot(obj)
+                if obj != act_obj and obj.type in PIVOT_TYPES:
+                    if self_or_active == "0":
+                        ref2_co = find_ref2_co(obj)
+                    moves.append((obj, pivot_offset(obj)))
 
         if active_too is True:
-            if act_obj.type == 'MESH':
+            if act_obj.type in PIVOT_TYPES:
                 if loc_x or loc_y or loc_z:
                     if self_or_active == "0":
                         ref2_co = find_ref2_co(act_obj)
-                    move_pivot(act_obj)
+                    moves.append((act_obj, pivot_offset(act_obj)))
+
+        move_pivots(moves)
 
     elif subject == "2":
         if self_or_active == "1":
-            if act_obj.type == 'MESH' or act_obj.type == 'FONT' or act_obj.type == 'SURFACE':
+            if act_obj.type in measured_types:
                 ref2_co = find_ref2_co(act_obj)
                 ref_points = get_reference_points(act_obj, "global")
             else:
@@ -519,9 +452,9 @@ def align_function(subject, active_too, consistent, self_or_active, loc_x, loc_y
                     bpy.context.scene.cursor.location[2] = ref_points[8] + \
                         loc_offset[2]
         elif self_or_active == "2":
-            ref_co = point_in_selection(act_obj, sel_obj)
-
-            sel_min, sel_max = get_sel_ref(ref_co, sel_obj)
+            _, sel_min, sel_max = selection_extent()
+            if sel_min is None:
+                return
             sel_center = sel_min + ((sel_max - sel_min) / 2)
 
             if ref2 == "0":
@@ -568,52 +501,168 @@ class RAND321_OBJECT_OT_align_tools(Operator):
     # property definitions
 
     # Object-Pivot-Cursor:
+    subject: EnumProperty(
+        items=(("0", "Object", "Align objects"),
+               ("1", "Pivot", "Align the objects' pivots"),
+               ("2", "Cursor", "Align the 3D cursor")),
+        name="Align",
+        default="0"
+    )
+    active_too: BoolProperty(
+        name="Active too",
+        default=False,
+        description="Move the active object too"
+    )
+    consistent: BoolProperty(
+        name="Consistent",
+        default=False,
+        description="Move the selection as one block instead of every object on its own"
+    )
+    self_or_active: EnumProperty(
+        items=(("0", "Self", "Each object is its own reference"),
+               ("1", "Active", "Align to the active object"),
+               ("2", "Selection", "Align to the selection")),
+        name="Relation",
+        default="1"
+    )
+
+    # Align Location:
+    loc_x: BoolProperty(name="Align to X axis", default=False)
+    loc_y: BoolProperty(name="Align to Y axis", default=False)
+    loc_z: BoolProperty(name="Align to Z axis", default=False)
+    ref1: EnumProperty(
+        items=(("3", "Max", "Align the maximum point"),
+               ("1", "Center", "Align the center point"),
+               ("2", "Pivot", "Align the pivot"),
+               ("0", "Min", "Align the minimum point")),
+        name="Selection reference",
+        default="1",
+        description="Moved objects reference point"
+    )
+    ref2: EnumProperty(
+        items=(("3", "Max", "Align to the maximum point"),
+               ("1", "Center", "Align to the center point"),
+               ("2", "Pivot", "Align to the pivot"),
+               ("0", "Min", "Align to the minimum point"),
+               ("4", "Cursor", "Align to the 3D cursor")),
+        name="Active reference",
+        default="1",
+        description="Destination point"
+    )
+    loc_offset: FloatVectorProperty(name="Location offset", subtype='TRANSLATION')
+
+    # Align Rotation:
+    rot_x: BoolProperty(name="Rotation X", default=False)
+    rot_y: BoolProperty(name="Rotation Y", default=False)
+    rot_z: BoolProperty(name="Rotation Z", default=False)
+    rot_offset: FloatVectorProperty(name="Rotation offset", subtype='EULER')
+
+    # Align Scale:
+    scale_x: BoolProperty(name="Scale X", default=False)
+    scale_y: BoolProperty(name="Scale Y", default=False)
+    scale_z: BoolProperty(name="Scale Z", default=False)
+    scale_offset: FloatVectorProperty(name="Scale offset", subtype='XYZ')
+
+    # Fit Dimensions:
+    fit_x: BoolProperty(name="Fit X", default=False)
+    fit_y: BoolProperty(name="Fit Y", default=False)
+    fit_z: BoolProperty(name="Fit Z", default=False)
+
+    exact_bounds: BoolProperty(
+        name="Exact bounds",
+        default=False,
+        description="Measure rotated objects from all their points instead of their transformed bounding box"
+    )
+    evaluated: BoolProperty(
+        name="Use modifiers",
+        default=False,
+        description="Measure objects with their modifiers applied, curves are measured too"
+    )
+
+    # operator property -> scene property it defaults to when run from the panel
+    scene_defaults = (("loc_x", "loc_x"), ("loc_y", "loc_y"), ("loc_z", "loc_z"),
+                      ("ref1", "ref"), ("ref2", "ref"),
+                      ("exact_bounds", "align_exact_bounds"),
+                      ("evaluated", "align_evaluated"))
 
-    def execute(self, context):
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None
+
+    def invoke(self, context, event):
+        # settings the caller did not give come from the panel
         scn = context.scene
-        # dummy
-        self.subject = '0'
-        self.active_too = self.advanced = self.consistent = False
-        self.loc_x = scn.loc_x
-        self.loc_y = scn.loc_y
-        self.loc_z = scn.loc_z
-
-        self.ref1 = self.ref2 = scn.ref
-
-        self.self_or_active = "1"
-
-        self.loc_offset = self.rot_offset = self.scale_offset = (0.0, 0.0, 0.0)
-        self.fit_x = self.fit_y = self.fit_z = False
-        self.rot_x = self.rot_y = self.rot_z = False
-        self.scale_x = self.scale_y = self.scale_z = False
-        self.apply_dim = self.apply_rot = self.apply_scale = False
-
-        # align_function(
-        #     self.subject, self.active_too, self.consistent,
-        #     self.self_or_active, self.loc_x, self.loc_y, self.loc_z,
-        #     self.ref1, self.ref2, self.loc_offset,
-        #     self.rot_x, self.rot_y, self.rot_z, self.rot_offset,
-        #     self.scale_x, self.scale_y, self.scale_z, self.scale_offset,
-        #     self.fit_x, self.fit_y, self.fit_z
-        # )
-
-        print("Called!!!!")
+        for prop, scene_prop in self.scene_defaults:
+            if not self.properties.is_property_set(prop):
+                setattr(self, prop, getattr(scn, scene_prop))
+
+        return self.execute(context)
+
+    def execute(self, context):
+        """Applies the whole alignment to the selection at once.
+
+        Runs as one operator, so it is a single undo step and the scene is
+        evaluated once afterwards. Scripts and background jobs can call it
+        with every setting given as a keyword argument.
+        """
+
+        # a pending alignment from the panel would otherwise run after
+        # this, other pending updates such as spacing still run
+        update_scheduler.scheduler.cancel('align')
+
+        align_function(
+            self.subject, self.active_too, self.consistent,
+            self.self_or_active, self.loc_x, self.loc_y, self.loc_z,
+            self.ref1, self.ref2, Vector(self.loc_offset),
+            self.rot_x, self.rot_y, self.rot_z, Vector(self.rot_offset),
+            self.scale_x, self.scale_y, self.scale_z, Vector(self.scale_offset),
+            self.fit_x, self.fit_y, self.fit_z,
+            sel_obj=list(context.selected_objects),
+            act_obj=context.active_object,
+            exact_bounds=self.exact_bounds,
+            evaluated=self.evaluated
+        )
 
         return {'FINISHED'}
 
     @classmethod
     def register(cls):
-        def update_func(self, context): return align_function(
-            "0", False, False, "1",
-            context.scene.loc_x,
-            context.scene.loc_y,
-            context.scene.loc_z,
-            context.scene.ref,
-            context.scene.ref, Vector((0.0, 0.0, 0.0)),
-            False, False, False, Vector((0.0, 0.0, 0.0)),
-            False, False, False, Vector((0.0, 0.0, 0.0)),
-            False, False, False
-        )
+        def update_func(self, context):
+            # remember what was selected when the property changed, the
+            # update itself runs later from a timer without a context
+            scene_name = self.name
+            selected = [obj.name for obj in context.selected_objects]
+            active = context.active_object.name if context.active_object else None
+
+            def apply(final):
+                scene = bpy.data.scenes.get(scene_name)
+                act_obj = bpy.data.objects.get(active) if active else None
+                if scene is None or act_obj is None:
+                    return
+
+                sel_obj = [bpy.data.objects[name] for name in selected
+                           if name in bpy.data.objects]
+
+                align_function(
+                    "0", False, False, "1",
+                    scene.loc_x,
+                    scene.loc_y,
+                    scene.loc_z,
+                    scene.ref,
+                    scene.ref, Vector((0.0, 0.0, 0.0)),
+                    False, False, False, Vector((0.0, 0.0, 0.0)),
+                    False, False, False, Vector((0.0, 0.0, 0.0)),
+                    False, False, False,
+                    sel_obj=sel_obj, act_obj=act_obj,
+                    exact_bounds=scene.align_exact_bounds,
+                    evaluated=scene.align_evaluated
+                )
+
+            # the settled result becomes one undo step
+            update_scheduler.scheduler.request('align', apply, undo="Align Objects")
+
+        object_bounds.register()
+
         # Align Location:
         bpy.types.Scene.loc_x = bpy.props.BoolProperty(
             name="Align to X axis",
@@ -633,6 +682,18 @@ class RAND321_OBJECT_OT_align_tools(Operator):
             description="Enable Z axis alignment",
             update=update_func
         )
+        bpy.types.Scene.align_exact_bounds = bpy.props.BoolProperty(
+            name="Exact bounds",
+            default=False,
+            description="Measure rotated objects from all their points instead of their transformed bounding box",
+            update=update_func
+        )
+        bpy.types.Scene.align_evaluated = bpy.props.BoolProperty(
+            name="Use modifiers",
+            default=False,
+            description="Measure objects with their modifiers applied, curves are measured too",
+            update=update_func
+        )
         # Selection Option:
         bpy.types.Scene.ref = bpy.props.EnumProperty(
             items=(("3", "", "Align the maximum point", "ALIGN_TOP", 3),
@@ -646,204 +707,51 @@ class RAND321_OBJECT_OT_align_tools(Operator):
 
     @classmethod
     def unregister(cls):
+        update_scheduler.scheduler.cancel()
+        object_bounds.unregister()
+
         # Align Location:
         del bpy.types.Scene.loc_x
         del bpy.types.Scene.loc_y
         del bpy.types.Scene.loc_z
         del bpy.types.Scene.ref
+        del bpy.types.Scene.align_exact_bounds
+        del bpy.types.Scene.align_evaluated
 
 
-class OBJECT_OT_AlignOperator(Operator):
-    bl_idname = "object.align"
+# Simple Align
+class OBJECT_OT_align_to_active(Operator):
+    bl_idname = "object.align_to_active"
     bl_label = "Align Selected To Active"
-    bl_description = "Align Selected To Active"
-
-    @classmethod
-    def poll(cls, context):
-        return context.active_object is not None
-
-    def execute(self, context):
-        main(context)
-        return {'FINISHED'}
-
-
-# Align Location All
-class OBJECT_OT_AlignLocationOperator(Operator):
-    bl_idname = "object.align_location_all"
-    bl_label = "Align Selected Location To Active"
-    bl_description = "Align Selected Location To Active"
-
-    @classmethod
-    def poll(cls, context):
-        return context.active_object is not None
-
-    def execute(self, context):
-        LocAll(context)
-        return {'FINISHED'}
-
-
-# Align Location X
-class OBJECT_OT_AlignLocationXOperator(Operator):
-    bl_idname = "object.align_location_x"
-    bl_label = "Align Selected Location X To Active"
-    bl_description = "Align Selected Location X To Active"
-
-    @classmethod
-    def poll(cls, context):
-        return context.active_object is not None
-
-    def execute(self, context):
-        LocX(context)
-        return {'FINISHED'}
-
-
-# Align Location Y
-class OBJECT_OT_AlignLocationYOperator(Operator):
-    bl_idname = "object.align_location_y"
-    bl_label = "Align Selected Location Y To Active"
-    bl_description = "Align Selected Location Y To Active"
-
-    @classmethod
-    def poll(cls, context):
-        return context.active_object is not None
-
-    def execute(self, context):
-        LocY(context)
-        return {'FINISHED'}
-
-
-# Align LocationZ
-class OBJECT_OT_AlignLocationZOperator(Operator):
-    bl_idname = "object.align_location_z"
-    bl_label = "Align Selected Location Z To Active"
-    bl_description = "Align Selected Location Z To Active"
-
-    @classmethod
-    def poll(cls, context):
-        return context.active_object is not None
-
-    def execute(self, context):
-        LocZ(context)
-        return {'FINISHED'}
-
-
-# Align Rotation All
-class OBJECT_OT_AlignRotationOperator(Operator):
-    bl_idname = "object.align_rotation_all"
-    bl_label = "Align Selected Rotation To Active"
-    bl_description = "Align Selected Rotation To Active"
-
-    @classmethod
-    def poll(cls, context):
-        return context.active_object is not None
-
-    def execute(self, context):
-        RotAll(context)
-        return {'FINISHED'}
-
-
-# Align Rotation X
-class OBJECT_OT_AlignRotationXOperator(Operator):
-    bl_idname = "object.align_rotation_x"
-    bl_label = "Align Selected Rotation X To Active"
-    bl_description = "Align Selected Rotation X To Active"
-
-    @classmethod
-    def poll(cls, context):
-        return context.active_object is not None
-
-    def execute(self, context):
-        RotX(context)
-        return {'FINISHED'}
-
-
-# Align Rotation Y
-class OBJECT_OT_AlignRotationYOperator(Operator):
-    bl_idname = "object.align_rotation_y"
-    bl_label = "Align Selected Rotation Y To Active"
-    bl_description = "Align Selected Rotation Y To Active"
-
-    @classmethod
-    def poll(cls, context):
-        return context.active_object is not None
-
-    def execute(self, context):
-        RotY(context)
-        return {'FINISHED'}
-
-
-# Align Rotation Z
-class OBJECT_OT_AlignRotationZOperator(Operator):
-    bl_idname = "object.align_rotation_z"
-    bl_label = "Align Selected Rotation Z To Active"
-    bl_description = "Align Selected Rotation Z To Active"
-
-    @classmethod
-    def poll(cls, context):
-        return context.active_object is not None
-
-    def execute(self, context):
-        RotZ(context)
-        return {'FINISHED'}
-
-
-# Scale All
-class OBJECT_OT_AlignScaleOperator(Operator):
-    bl_idname = "object.align_objects_scale_all"
-    bl_label = "Align Selected Scale To Active"
-    bl_description = "Align Selected Scale To Active"
-
-    @classmethod
-    def poll(cls, context):
-        return context.active_object is not None
-
-    def execute(self, context):
-        ScaleAll(context)
-        return {'FINISHED'}
-
-
-# Align Scale X
-class OBJECT_OT_AlignScaleXOperator(Operator):
-    bl_idname = "object.align_objects_scale_x"
-    bl_label = "Align Selected Scale X To Active"
-    bl_description = "Align Selected Scale X To Active"
-
-    @classmethod
-    def poll(cls, context):
-        return context.active_object is not None
-
-    def execute(self, context):
-        ScaleX(context)
-        return {'FINISHED'}
-
-
-# Align Scale Y
-class OBJECT_OT_AlignScaleYOperator(Operator):
-    bl_idname = "object.align_objects_scale_y"
-    bl_label = "Align Selected Scale Y To Active"
-    bl_description = "Align Selected Scale Y To Active"
-
-    @classmethod
-    def poll(cls, context):
-        return context.active_object is not None
-
-    def execute(self, context):
-        ScaleY(context)
-        return {'FINISHED'}
-
+    bl_description = "Copy location, rotation or scale of the active object to the selected objects"
+    bl_options = {'REGISTER', 'UNDO'}
 
-# Align Scale Z
-class OBJECT_OT_AlignScaleZOperator(Operator):
-    bl_idname = "object.align_objects_scale_z"
-    bl_label = "Align Selected Scale Z To Active"
-    bl_description = "Align Selected Scale Z To Active"
+    location: BoolVectorProperty(
+        name="Location",
+        description="World location axes to align",
+        default=(True, True, True),
+        subtype='XYZ'
+    )
+    rotation: BoolVectorProperty(
+        name="Rotation",
+        description="Rotation axes to align",
+        default=(False, False, False),
+        subtype='XYZ'
+    )
+    scale: BoolVectorProperty(
+        name="Scale",
+        description="Scale axes to align",
+        default=(False, False, False),
+        subtype='XYZ'
+    )
 
     @classmethod
     def poll(cls, context):
         return context.active_object is not None
 
     def execute(self, context):
-        ScaleZ(context)
+        align_to_active(context.selected_objects, context.active_object,
+                        self.location, self.rotation, self.scale)
         return {'FINISHED'}
 
 
@@ -880,6 +788,12 @@ class RAND321VIEW3D_PT_AlignUi(Panel):
             row5.alignment = "CENTER"
             row5.prop(scn, 'ref', expand=True)
 
+            row6 = layout.row()
+            row6.prop(scn, "align_exact_bounds")
+            row6.prop(scn, "align_evaluated")
+
+            layout.operator("object.rand321_align_tools", text="Align Selected")
+
         layout.separator()
 
         layout.label(text='Font Spacing:')
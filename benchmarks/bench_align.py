@@ -0,0 +1,141 @@
+"""Compares the per-axis simple align helpers with align_to_active.
+
+Run from a shell with:
+
+    blender -b --factory-startup --python benchmarks/bench_align.py -- [object counts...]
+"""
+
+import importlib
+import os
+import sys
+import time
+
+import bpy
+import numpy as np
+
+addon_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, os.path.dirname(addon_dir))
+addon = importlib.import_module(os.path.basename(addon_dir))
+aligning_tools = addon.aligning_tools
+
+AXES = ((True, False, False), (False, True, False), (False, False, True),
+        (True, True, True))
+
+
+# the helpers as they were before align_to_active, one per channel and axis
+
+def old_location(objects, active, axes):
+    for i in objects:
+        if axes == (True, True, True):
+            i.matrix_world.translation = bpy.context.active_object.matrix_world.translation.copy()
+        else:
+            for axis, on in enumerate(axes):
+                if on:
+                    i.matrix_world.translation[axis] = bpy.context.active_object.matrix_world.translation[axis]
+
+
+def old_rotation(objects, active, axes):
+    for i in objects:
+        if axes == (True, True, True):
+            i.rotation_euler = bpy.context.active_object.rotation_euler
+        else:
+            for axis, on in enumerate(axes):
+                if on:
+                    i.rotation_euler[axis] = bpy.context.active_object.rotation_euler[axis]
+
+
+def old_scale(objects, active, axes):
+    for i in objects:
+        if axes == (True, True, True):
+            i.scale = bpy.context.active_object.scale
+        else:
+            for axis, on in enumerate(axes):
+                if on:
+                    i.scale[axis] = bpy.context.active_object.scale[axis]
+
+
+def new_location(objects, active, axes):
+    aligning_tools.align_to_active(objects, active, location=axes)
+
+
+def new_rotation(objects, active, axes):
+    aligning_tools.align_to_active(objects, active, rotation=axes)
+
+
+def new_scale(objects, active, axes):
+    aligning_tools.align_to_active(objects, active, scale=axes)
+
+
+def make_objects(count):
+    """Adds count selected empties at random transforms and a selected active empty"""
+
+    collection = bpy.context.scene.collection
+    objects = []
+    for values in np.random.rand(count, 9).tolist():
+        obj = bpy.data.objects.new('bench', None)
+        obj.location = values[0:3]
+        obj.rotation_euler = values[3:6]
+        obj.scale = values[6:9]
+        collection.objects.link(obj)
+        objects.append(obj)
+
+    active = bpy.data.objects.new('bench-active', None)
+    active.location = (1, 2, 3)
+    active.rotation_euler = (0.3, 0.2, 0.1)
+    active.scale = (2, 2, 2)
+    collection.objects.link(active)
+
+    bpy.context.view_layer.objects.active = active
+    for obj in objects + [active]:
+        obj.select_set(True)
+    bpy.context.view_layer.update()
+    return objects, active
+
+
+def reset(objects, state):
+    for obj, (loc, rot, scale) in zip(objects, state):
+        obj.location, obj.rotation_euler, obj.scale = loc, rot, scale
+    bpy.context.view_layer.update()
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    counts = [int(a) for a in argv] or [10000]
+
+    print(f'{"channel":>9} {"axes":>5} {"objects":>8} {"old (s)":>10} {"new (s)":>10} {"speedup":>8}')
+    for count in counts:
+        objects, active = make_objects(count)
+        state = [(tuple(o.location), tuple(o.rotation_euler), tuple(o.scale))
+                 for o in objects]
+
+        for name, old, new in (('location', old_location, new_location),
+                               ('rotation', old_rotation, new_rotation),
+                               ('scale', old_scale, new_scale)):
+            for axes in AXES:
+                label = ''.join('XYZ'[i] for i, on in enumerate(axes) if on)
+
+                reset(objects, state)
+                old_time = timed(old, objects, active, axes)
+                expected = [(tuple(o.location), tuple(o.rotation_euler), tuple(o.scale))
+                            for o in objects]
+
+                reset(objects, state)
+                new_time = timed(new, objects, active, axes)
+                result = [(tuple(o.location), tuple(o.rotation_euler), tuple(o.scale))
+                          for o in objects]
+                assert np.allclose(expected, result, atol=1e-5)
+
+                print(f'{name:>9} {label:>5} {count:>8} {old_time:>10.3f} {new_time:>10.3f} '
+                      f'{old_time / new_time:>7.1f}x')
+
+        for obj in objects + [active]:
+            bpy.data.objects.remove(obj)
+
+
+main()
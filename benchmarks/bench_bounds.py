@@ -0,0 +1,116 @@
+"""Compares the per-vertex bounding box loop of align_function with the numpy path.
+
+Run from a shell with:
+
+    blender -b --factory-startup --python benchmarks/bench_bounds.py -- [vertex counts...]
+"""
+
+import importlib
+import os
+import sys
+import time
+
+import bpy
+import numpy as np
+
+addon_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, os.path.dirname(addon_dir))
+addon = importlib.import_module(os.path.basename(addon_dir))
+object_bounds = addon.object_bounds
+
+
+def old_reference_points(obj, space):
+    """get_reference_points as it was before the numpy path"""
+
+    me = obj.data
+    co_list = []
+    ok = False
+    obj_mtx = obj.matrix_world
+    if obj.type == 'MESH' and len(me.vertices) > 0:
+        ok = True
+        for p in me.vertices:
+            co_list.append((obj_mtx @ p.co) if space == "global" else p.co)
+    elif obj.type == 'SURFACE' and len(me.splines) > 0:
+        ok = True
+        for s in me.splines:
+            for p in s.points:
+                co_list.append((obj_mtx @ p.co) if space == "global" else p.co)
+
+    if ok:
+        max_x = min_x = co_list[0][0]
+        max_y = min_y = co_list[0][1]
+        max_z = min_z = co_list[0][2]
+        for v in co_list:
+            if v[0] > max_x:
+                max_x = v[0]
+            if v[0] < min_x:
+                min_x = v[0]
+            if v[1] > max_y:
+                max_y = v[1]
+            if v[1] < min_y:
+                min_y = v[1]
+            if v[2] > max_z:
+                max_z = v[2]
+            if v[2] < min_z:
+                min_z = v[2]
+    else:
+        a = obj.matrix_world.translation
+        min_x = max_x = a[0]
+        min_y = max_y = a[1]
+        min_z = max_z = a[2]
+
+    return [min_x, min_x + (max_x - min_x) / 2, max_x,
+            min_y, min_y + (max_y - min_y) / 2, max_y,
+            min_z, min_z + (max_z - min_z) / 2, max_z]
+
+
+def make_mesh(count):
+    me = bpy.data.meshes.new('bench')
+    me.vertices.add(count)
+    me.vertices.foreach_set('co', np.random.rand(count * 3))
+    obj = bpy.data.objects.new('bench-mesh', me)
+    obj.rotation_euler = (0.3, 0.2, 0.1)
+    obj.location = (1, 2, 3)
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+
+def make_surface(count):
+    cu = bpy.data.curves.new('bench', 'SURFACE')
+    spline = cu.splines.new('NURBS')
+    spline.points.add(count - 1)
+    co = np.random.rand(count, 4)
+    co[:, 3] = 1
+    spline.points.foreach_set('co', co.ravel())
+    obj = bpy.data.objects.new('bench-surface', cu)
+    obj.rotation_euler = (0.3, 0.2, 0.1)
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    counts = [int(a) for a in argv] or [10000, 100000, 1000000]
+
+    bpy.context.view_layer.update()
+    print(f'{"type":>8} {"points":>9} {"old (s)":>10} {"new (s)":>10} {"speedup":>8}')
+    for make in (make_mesh, make_surface):
+        for count in counts:
+            obj = make(count)
+            bpy.context.view_layer.update()
+
+            old, expected = timed(old_reference_points, obj, "global")
+            new, result = timed(object_bounds.reference_points, obj, "global")
+            assert np.allclose(expected, result, atol=1e-4)
+
+            print(f'{obj.type:>8} {count:>9} {old:>10.3f} {new:>10.3f} {old / new:>7.1f}x')
+            bpy.data.objects.remove(obj)
+
+
+main()
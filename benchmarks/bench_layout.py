@@ -0,0 +1,143 @@
+"""Compares the old operator based text layout with direct placement.
+
+Run from a shell with:
+
+    blender -b --factory-startup --python benchmarks/bench_layout.py -- [filler objects] [sizes...]
+
+The scene is first filled with unrelated objects, since the cost of the old
+path grows with the number of objects in the scene.
+"""
+
+import sys
+import time
+
+import bpy
+
+
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+
+
+def make_glyphs():
+    """Creates one small mesh per letter of ALPHABET, not linked to the scene"""
+
+    glyphs = {}
+    for i, letter in enumerate(ALPHABET):
+        width = 0.5 + (i % 7) * 0.1
+        me = bpy.data.meshes.new(f'{letter}-bench')
+        me.from_pydata([(0, 0, 0), (width, 0, 0), (width, 1, 0), (0, 1, 0)],
+                       [], [(0, 1, 2, 3)])
+        glyphs[letter] = bpy.data.objects.new(f'{letter}-bench', me)
+    return glyphs
+
+
+def fill_scene(count):
+    """Adds count empties to the scene"""
+
+    for i in range(count):
+        obj = bpy.data.objects.new(f'filler-{i}', None)
+        bpy.context.scene.collection.objects.link(obj)
+
+
+def clear_collection(word):
+    for obj in list(word.objects):
+        bpy.data.objects.remove(obj)
+    bpy.data.collections.remove(word)
+
+
+def old_layout(text, glyphs, spacing):
+    """Layout loop as it was before direct placement"""
+
+    word = bpy.data.collections.new(text[:32])
+    bpy.context.scene.collection.children.link(word)
+
+    pos = 0
+    for letter in text:
+        obj = glyphs.get(letter)
+        if obj:
+            new_obj = obj.copy()
+            new_obj.data = obj.data.copy()
+            new_obj.location = (0, 0, 0)
+
+            word.objects.link(new_obj)
+            bpy.ops.object.select_all(action='DESELECT')
+            new_obj.select_set(True)
+            bpy.ops.transform.translate(value=(pos, 0, 0))
+            pos += new_obj.dimensions.x + spacing
+
+    return word
+
+
+def glyph_width(obj):
+    """Width of a glyph along the x axis read from its data, without a depsgraph"""
+
+    if obj.type == 'MESH' and len(obj.data.vertices) > 0:
+        xs = [v.co.x for v in obj.data.vertices]
+        return (max(xs) - min(xs)) * abs(obj.scale.x)
+
+    xs = [corner[0] for corner in obj.bound_box]
+    return (max(xs) - min(xs)) * abs(obj.scale.x)
+
+
+def compute_offsets(text, widths, spacing):
+    """(index, x) of every letter of text that has a glyph, as before the layout table"""
+
+    offsets = []
+    pos = 0
+    for index, letter in enumerate(text):
+        width = widths.get(letter)
+        if width is None:
+            continue
+
+        offsets.append((index, pos))
+        pos += width + spacing
+
+    return offsets
+
+
+def new_layout(text, glyphs, spacing):
+    """Layout loop using precomputed offsets"""
+
+    word = bpy.data.collections.new(text[:32])
+    bpy.context.scene.collection.children.link(word)
+
+    widths = {letter: glyph_width(glyphs[letter])
+              for letter in set(text) if letter in glyphs}
+
+    for index, pos in compute_offsets(text, widths, spacing):
+        obj = glyphs[text[index]]
+        new_obj = obj.copy()
+        new_obj.data = obj.data.copy()
+        new_obj.location = (pos, 0, 0)
+
+        word.objects.link(new_obj)
+
+    return word
+
+
+def run(func, text, glyphs):
+    start = time.perf_counter()
+    word = func(text, glyphs, 0.5)
+    bpy.context.view_layer.update()
+    elapsed = time.perf_counter() - start
+    clear_collection(word)
+    return elapsed
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    filler = int(argv[0]) if argv else 5000
+    sizes = [int(a) for a in argv[1:]] or [100, 1000, 10000]
+
+    glyphs = make_glyphs()
+    fill_scene(filler)
+
+    print(f'scene objects: {len(bpy.context.scene.objects)}')
+    print(f'{"letters":>8} {"old (s)":>10} {"new (s)":>10} {"speedup":>8}')
+    for size in sizes:
+        text = (ALPHABET * (size // len(ALPHABET) + 1))[:size]
+        old = run(old_layout, text, glyphs)
+        new = run(new_layout, text, glyphs)
+        print(f'{size:>8} {old:>10.3f} {new:>10.3f} {old / new:>7.1f}x')
+
+
+main()
@@ -0,0 +1,184 @@
+"""Index of the fonts available in the add-on.
+
+The catalog maps every font name to its .blend file, preview image, glyph
+letters, metrics sidecar and content hashes, and is stored in
+font_catalog.json in the add-on's data folder. Operators and panels look fonts up
+here instead of listing the styles and previews folders; the folders are
+only listed again by an explicit rescan. Imports and removals update the
+catalog one font at a time.
+"""
+
+import json
+import os
+
+from . import font_import
+from . import font_previews
+from . import glyph_metrics
+
+CATALOG_VERSION = 1
+
+
+class FontCatalog:
+    """Font name -> record of the fonts stored in the add-on directory.
+
+    A record holds 'font', 'preview' and 'metrics' paths relative to the
+    add-on directory, the sorted 'glyphs' letters, the sha1 of the font
+    and preview files in 'font_hash' and 'preview_hash' and a 'number'
+    that stays with the font name for as long as it is in the catalog and
+    is never given to another font. revision grows on every change, so
+    lists derived from the catalog know when to rebuild.
+    """
+
+    def __init__(self, addon_dir, data_dir=None):
+        self.addon_dir = addon_dir
+        self.prefab_dir = os.path.join(addon_dir, "styles")
+        self.previews_dir = os.path.join(addon_dir, "previews")
+        self.index_path = os.path.join(data_dir or addon_dir, "font_catalog.json")
+
+        self.fonts = {}
+        # number of the next font added
+        self.next_number = 1
+        self.revision = 0
+        # (revision, sorted font names)
+        self._names = (None, [])
+
+    def __contains__(self, name):
+        return name in self.fonts
+
+    def __len__(self):
+        return len(self.fonts)
+
+    def names(self):
+        """Returns the sorted font names, sorted once per revision"""
+
+        if self._names[0] != self.revision:
+            self._names = (self.revision, sorted(self.fonts))
+        return self._names[1]
+
+    def _abs(self, path):
+        return os.path.join(self.addon_dir, path) if path else None
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.addon_dir).replace(os.sep, '/') if path else None
+
+    def font_path(self, name):
+        return self._abs(self.fonts[name]['font'])
+
+    def preview_path(self, name):
+        """Returns the preview image of a font, None if it has none or is not in the catalog"""
+
+        record = self.fonts.get(name)
+        return self._abs(record['preview']) if record else None
+
+    def metrics(self, name):
+        """Returns the metrics of a font, measured again if its sidecar is missing or
+        older than the font, None if it is not in the catalog or its file is gone"""
+
+        if name not in self.fonts:
+            return None
+        try:
+            return glyph_metrics.ensure_metrics(self.font_path(name), name)
+        except OSError as e:
+            print(e)
+            return None
+
+    def number(self, name):
+        return self.fonts[name]['number']
+
+    def glyphs(self, name):
+        return self.fonts[name]['glyphs']
+
+    def previews(self):
+        """Returns dict mapping font name to preview image of every font that has one"""
+
+        return {name: self._abs(r['preview']) for name, r in self.fonts.items()
+                if r['preview']}
+
+    def load(self):
+        """Reads the index file, rescanning the folders if there is none"""
+
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+
+        if data.get('version') != CATALOG_VERSION:
+            self.rescan()
+            return
+
+        self.fonts = data.get('fonts', {})
+        self.next_number = data.get('next_number', 1)
+
+        self.revision += 1
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        with open(self.index_path, 'w') as f:
+            json.dump({'version': CATALOG_VERSION, 'next_number': self.next_number,
+                       'fonts': self.fonts},
+                      f, indent=1, sort_keys=True)
+
+    def _new_number(self):
+        number = self.next_number
+        self.next_number += 1
+        return number
+
+    def _record(self, name, font_path, preview_path, font_hash=None, preview_hash=None):
+        metrics_file = glyph_metrics.metrics_path(font_path)
+        metrics = glyph_metrics.load_metrics(metrics_file)
+
+        # a font that is replaced or found again keeps its number
+        old = self.fonts.get(name)
+
+        return {
+            'number': old['number'] if old is not None else self._new_number(),
+            'font': self._rel(font_path),
+            'preview': self._rel(preview_path),
+            'metrics': self._rel(metrics_file) if metrics is not None else None,
+            'glyphs': sorted(metrics['glyphs']) if metrics is not None else [],
+            'font_hash': font_hash or font_import.file_hash(font_path),
+            'preview_hash': (preview_hash or font_import.file_hash(preview_path))
+            if preview_path else None,
+        }
+
+    def rescan(self):
+        """Lists the styles and previews folders and builds every record again"""
+
+        fonts = {}
+        try:
+            previews = font_previews.scan_previews(self.prefab_dir, self.previews_dir)
+        except OSError as e:
+            print(e)
+            previews = {}
+
+        for name, preview in sorted(previews.items()):
+            try:
+                fonts[name] = self._record(
+                    name, os.path.join(self.prefab_dir, f'{name}.blend'), preview)
+            except OSError as e:
+                print(e)
+
+        self.fonts = fonts
+        self.revision += 1
+        self.save()
+
+    def add(self, name, font_path, preview_path, font_hash=None, preview_hash=None,
+            save=True):
+        """Adds or replaces the record of one font and saves the index
+
+        save - False to leave saving to the caller, when many fonts are added at once
+        """
+
+        self.fonts[name] = self._record(name, font_path, preview_path, font_hash,
+                                        preview_hash)
+        self.revision += 1
+        if save:
+            self.save()
+
+    def remove(self, name):
+        """Drops the record of one font and saves the index"""
+
+        if self.fonts.pop(name, None) is not None:
+            self.revision += 1
+            self.save()
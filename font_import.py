@@ -0,0 +1,401 @@
+"""Copying fonts and their previews into the add-on.
+
+Every imported file is recorded in a manifest with the size and
+modification time of its source and a hash of its content. A source whose
+size and time did not change since the last import is skipped without
+reading it, changed sources are hashed and only copied when their content
+differs from what was imported before. A font whose content is already
+imported under another name is reported as a duplicate and not copied.
+
+BackgroundImport runs the copying and hashing in a thread pool, so Blender
+stays responsive while a large folder is imported.
+"""
+
+import collections
+import concurrent.futures
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+MANIFEST_VERSION = 1
+
+# image types used as font previews, a font with several previews uses the
+# one whose extension comes first
+PREVIEW_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.tga', '.bmp', '.tif', '.tiff')
+
+# a font found by scan_fonts, preview is None if it has none
+FontSource = collections.namedtuple('FontSource', ('name', 'font', 'preview'))
+
+# files are hashed in blocks of this size, so large fonts are never read at once
+HASH_BLOCK = 1 << 20
+
+
+def file_hash(path):
+    """Returns the sha1 hex digest of the content of a file"""
+
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_fonts(path, recursive=True):
+    """Returns a FontSource for every .blend file under path, sorted by path.
+
+    Every directory is listed once with os.scandir and its entries are
+    grouped by stem, so a font is paired with the preview of the same name
+    in the same directory. Fonts of the same name in different directories
+    are all returned, importing keeps only the first.
+
+    recursive - also look in sub-folders
+    """
+
+    fonts = []
+    folders = [path]
+    while folders:
+        folder = folders.pop()
+
+        # stem -> font path, stem -> (extension priority, preview path)
+        blends = {}
+        images = {}
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and not entry.name.startswith('.'):
+                            folders.append(entry.path)
+                        continue
+
+                    stem, ext = os.path.splitext(entry.name)
+                    ext = ext.lower()
+                    if ext == '.blend':
+                        blends[stem] = entry.path
+                    elif ext in PREVIEW_EXTENSIONS:
+                        priority = PREVIEW_EXTENSIONS.index(ext)
+                        if stem not in images or priority < images[stem][0]:
+                            images[stem] = (priority, entry.path)
+        except OSError as e:
+            print(e)
+            continue
+
+        for stem, font in blends.items():
+            image = images.get(stem)
+            fonts.append(FontSource(stem, font, image[1] if image else None))
+
+    fonts.sort(key=lambda f: f.font)
+    return fonts
+
+
+class ImportReport:
+    """Names of the files an import added, updated, skipped or failed on"""
+
+    def __init__(self):
+        self.added = []
+        self.updated = []
+        self.skipped = []
+        # (file name, name of the imported file with the same content)
+        self.duplicates = []
+        # (file name, error message)
+        self.errors = []
+        # fonts found without a preview
+        self.unpaired = []
+        # (font path, path of the font imported under the same name)
+        self.conflicts = []
+
+    def summary(self):
+        text = f'Added {len(self.added)}, updated {len(self.updated)}, ' \
+            f'skipped {len(self.skipped)}'
+        if self.duplicates:
+            text += f', {len(self.duplicates)} duplicate'
+        if self.unpaired:
+            text += f', {len(self.unpaired)} without preview'
+        if self.conflicts:
+            text += f', {len(self.conflicts)} name taken'
+        if self.errors:
+            text += f', {len(self.errors)} failed: {self.errors[0][1]}'
+        return text
+
+
+class ImportManifest:
+    """Records of imported files stored as json.
+
+    Records are keyed by the path of the imported file relative to root and
+    hold size, mtime and path of the source and the sha1 of the content.
+
+    path - the json file
+    root - directory imported files are stored under, the directory of path by default
+    """
+
+    def __init__(self, path, root=None):
+        self.path = path
+        self.root = root if root is not None else os.path.dirname(path)
+        self.records = {}
+        # records are read and written from the threads of a BackgroundImport
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+
+        if data.get('version') == MANIFEST_VERSION:
+            self.records = data.get('files', {})
+        else:
+            self.records = {}
+
+    def save(self):
+        with self._lock:
+            data = {'version': MANIFEST_VERSION, 'files': dict(self.records)}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+    def _key(self, dest):
+        return os.path.relpath(dest, self.root).replace(os.sep, '/')
+
+    def find_hash(self, content_hash, folder):
+        """Returns the key of an imported file in folder with the given content, or None"""
+
+        for key, record in self.records.items():
+            if record['hash'] == content_hash and key.startswith(folder + '/'):
+                return key
+        return None
+
+    def sync_file(self, source, dest, dedupe=False):
+        """Copies source to dest unless dest already has the same content.
+
+        Returns 'added', 'updated' or 'skipped'. With dedupe, a new file whose
+        content is already imported under another name is not copied and
+        the manifest key of that file is returned instead.
+        """
+
+        stat = os.stat(source)
+        key = self._key(dest)
+        with self._lock:
+            record = self.records.get(key)
+        exists = os.path.exists(dest)
+
+        # unchanged source, decided from its stat alone
+        if exists and record is not None and record['size'] == stat.st_size and \
+                record['mtime'] == stat.st_mtime:
+            return 'skipped'
+
+        content_hash = file_hash(source)
+        new_record = {'source': source, 'size': stat.st_size,
+                      'mtime': stat.st_mtime, 'hash': content_hash}
+
+        if exists:
+            # a file imported by hand or before the manifest existed is
+            # hashed once to tell whether it is the same
+            known = record['hash'] if record is not None else file_hash(dest)
+            if known == content_hash:
+                with self._lock:
+                    self.records[key] = new_record
+                return 'skipped'
+        elif dedupe:
+            with self._lock:
+                same = self.find_hash(content_hash, key.split('/', 1)[0])
+                if same is not None and not os.path.exists(os.path.join(self.root, same)):
+                    # removed by hand since it was imported
+                    same = None
+                if same is None:
+                    # claim the content before copying, so a second copy
+                    # of the font imported at the same time is a duplicate
+                    self.records[key] = new_record
+            if same is not None:
+                return same
+
+        try:
+            # the copy keeps the time of its source, files shipped next to
+            # it such as metrics sidecars are compared against that
+            shutil.copy2(source, dest)
+        except OSError:
+            with self._lock:
+                self.records.pop(key, None)
+            raise
+
+        with self._lock:
+            self.records[key] = new_record
+        return 'updated' if exists else 'added'
+
+    def content_hash(self, dest):
+        """Returns the recorded sha1 of an imported file, or None"""
+
+        with self._lock:
+            record = self.records.get(self._key(dest))
+        return record['hash'] if record is not None else None
+
+    def forget(self, dest):
+        with self._lock:
+            self.records.pop(self._key(dest), None)
+
+
+def _remove_other_previews(preview, manifest):
+    """Deletes previews of the same font with another extension, left from earlier imports"""
+
+    stem, ext = os.path.splitext(preview)
+    for other in PREVIEW_EXTENSIONS:
+        path = stem + other
+        if other != ext.lower() and os.path.exists(path) and \
+                not os.path.samefile(path, preview):
+            os.remove(path)
+            manifest.forget(path)
+
+
+def _import_font(font_path, image_path, manifest, prefab_dir, preview_dir):
+    """Imports one font and its preview.
+
+    Returns (font name, status, preview, errors): status is 'added',
+    'updated', 'skipped', the key of the font with the same content, or None
+    if the font could not be copied, preview is the path of the imported
+    preview.
+    """
+
+    font_file_name = os.path.basename(font_path)
+    font_name = os.path.splitext(font_file_name)[0]
+    errors = []
+    preview = None
+
+    try:
+        status = manifest.sync_file(font_path, os.path.join(prefab_dir, font_file_name),
+                                    dedupe=True)
+    except OSError as e:
+        return font_name, None, None, [(font_file_name, str(e))]
+
+    if status in ('added', 'updated', 'skipped'):
+        # previews are named after the font whatever their source is called
+        ext = os.path.splitext(image_path)[1]
+        preview = os.path.join(preview_dir, font_name + ext)
+        try:
+            if manifest.sync_file(image_path, preview) != 'skipped' and status == 'skipped':
+                # a new preview changes how the font is shown
+                status = 'updated'
+            _remove_other_previews(preview, manifest)
+        except OSError as e:
+            errors.append((os.path.basename(image_path), str(e)))
+            preview = None
+
+    return font_name, status, preview, errors
+
+
+def _unique_names(pairs, report):
+    """Returns pairs without the fonts whose file name is used by a font before them.
+
+    Fonts are copied to a single folder, two fonts called the same would
+    overwrite each other, the others are reported as conflicts.
+    """
+
+    # font file name -> first font path
+    seen = {}
+    unique = []
+    for font_path, image_path in pairs:
+        name = os.path.basename(font_path)
+        if name in seen:
+            report.conflicts.append((font_path, seen[name]))
+            continue
+        seen[name] = font_path
+        unique.append((font_path, image_path))
+    return unique
+
+
+def _record(report, fonts, font_path, prefab_dir, result):
+    """Adds the result of _import_font to report and the imported fonts"""
+
+    font_name, status, preview, errors = result
+    report.errors.extend(errors)
+
+    if status in ('added', 'updated', 'skipped'):
+        getattr(report, status).append(font_name)
+        if status != 'skipped':
+            fonts.append((font_path, os.path.join(prefab_dir, os.path.basename(font_path)),
+                          preview))
+    elif status is not None:
+        report.duplicates.append((font_name, status))
+
+
+def import_fonts(pairs, manifest, prefab_dir, preview_dir, report=None):
+    """Copies fonts and previews that are new or changed into the add-on.
+
+    pairs - (font path, preview path) of every font to import
+    manifest - ImportManifest of the add-on
+    prefab_dir, preview_dir - where fonts and previews are stored
+
+    Returns (report, fonts): an ImportReport and the (source, font copy,
+    preview copy) paths of the fonts that were added or updated.
+    """
+
+    if report is None:
+        report = ImportReport()
+    fonts = []
+
+    for font_path, image_path in _unique_names(pairs, report):
+        _record(report, fonts, font_path, prefab_dir,
+                _import_font(font_path, image_path, manifest, prefab_dir, preview_dir))
+
+    manifest.save()
+    return report, fonts
+
+
+class BackgroundImport:
+    """Same as import_fonts, copying and hashing files in worker threads.
+
+    Nothing here touches bpy, results are collected by calling poll from
+    the main thread, e.g. from a bpy.app.timers timer. Preview thumbnails
+    are not made here: bpy.data and bpy.utils.previews may only be used
+    from the main thread, and Blender ships no other image library to
+    decode and scale them with, so PreviewCache makes them one per tick.
+
+    workers - number of threads, files are mostly waited for, not computed
+    """
+
+    def __init__(self, pairs, manifest, prefab_dir, preview_dir, report=None, workers=4):
+        self.manifest = manifest
+        self.prefab_dir = prefab_dir
+        self.report = report if report is not None else ImportReport()
+        self.fonts = []
+        pairs = _unique_names(pairs, self.report)
+        self.total = len(pairs)
+        self.done = 0
+
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        self._futures = {
+            self._pool.submit(_import_font, font_path, image_path, manifest,
+                              prefab_dir, preview_dir): font_path
+            for font_path, image_path in pairs}
+
+    def poll(self):
+        """Collects finished fonts, returns True once all of them are done"""
+
+        for future in [f for f in self._futures if f.done()]:
+            font_path = self._futures.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                result = os.path.basename(font_path), None, None, \
+                    [(os.path.basename(font_path), str(e))]
+            _record(self.report, self.fonts, font_path, self.prefab_dir, result)
+            self.done += 1
+
+        if self._futures:
+            return False
+
+        self._pool.shutdown(wait=False)
+        self.manifest.save()
+        return True
+
+    def cancel(self):
+        """Stops importing, fonts being copied are finished and kept in fonts and the manifest"""
+
+        for future in self._futures:
+            future.cancel()
+        self._pool.shutdown(wait=True)
+
+        for future in [f for f in self._futures if f.cancelled()]:
+            del self._futures[future]
+        self.poll()
@@ -0,0 +1,97 @@
+"""Session cache of font files opened by the text generator.
+
+Opening a font file with bpy.data.libraries.load is the slowest part of
+generating text, so the names of the glyphs in each file are remembered for
+the session. A file is only opened again when glyphs that are not loaded yet
+are needed, and then all of them are appended with a single load call.
+"""
+
+import os
+
+import bpy
+
+
+class FontLibrary:
+    """Keeps a letter -> glyph object name index per font file.
+
+    An index is valid as long as the file's modification time and size stay
+    the same. hits and misses count glyphs that were already loaded and glyphs
+    that had to be appended from the file.
+    """
+
+    def __init__(self):
+        # font path -> (mtime, size, {letter: object name})
+        self._index = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _file_key(self, font_path):
+        stat = os.stat(font_path)
+        return stat.st_mtime, stat.st_size
+
+    def _cached_index(self, font_path):
+        """Returns the glyph index of font_path if the file is unchanged, otherwise None"""
+
+        key = self._file_key(font_path)
+        cached = self._index.get(font_path)
+        if cached is None:
+            return None
+
+        if cached[:2] == key:
+            return cached[2]
+
+        # the file changed, glyphs appended from the old file are stale,
+        # existing letters keep their meshes
+        for name in cached[2].values():
+            obj = bpy.data.objects.get(name)
+            if obj is not None and obj.users == 0:
+                bpy.data.objects.remove(obj)
+
+        del self._index[font_path]
+        return None
+
+    def ensure_glyphs(self, font_path, font_name, letters):
+        """Makes sure glyph objects <letter>-<font name> are loaded for all letters found in the font.
+
+        Returns the number of glyphs that had to be appended.
+        """
+
+        index = self._cached_index(font_path)
+
+        missing = [letter for letter in letters
+                   if bpy.data.objects.get(f'{letter}-{font_name}') is None]
+        self.hits += len(letters) - len(missing)
+
+        if not missing:
+            return 0
+
+        if index is not None:
+            wanted = [index[letter] for letter in missing if letter in index]
+            # none of the missing letters exist in the font
+            if not wanted:
+                return 0
+
+        with bpy.data.libraries.load(font_path) as (data_from, data_to):
+            if index is None:
+                suffix = f'-{font_name}'
+                index = {name[:-len(suffix)]: name for name in data_from.objects
+                         if name.endswith(suffix) and len(name) > len(suffix)}
+                self._index[font_path] = self._file_key(font_path) + (index,)
+                wanted = [index[letter] for letter in missing if letter in index]
+
+            data_to.objects = wanted
+
+        self.misses += len(wanted)
+        return len(wanted)
+
+    def forget(self, font_path):
+        self._index.pop(font_path, None)
+
+    def clear(self):
+        self._index.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# shared by all operators for the lifetime of the add-on
+library = FontLibrary()
@@ -0,0 +1,191 @@
+"""Preview icons of fonts, loaded when they are first drawn.
+
+Registering the add-on only lists the preview and font folders to learn
+which fonts exist. A preview is loaded into the icon collection the first
+time a panel asks for its icon, from a small thumbnail stored in the
+add-on's data folder. Thumbnails are named after the font and the
+modification time of their source image, so a changed preview gets a new
+one and full size images are decoded only once, when their thumbnail is
+made.
+"""
+
+import os
+
+import bpy
+import bpy.utils.previews
+
+from . import font_import
+
+# longest side of a thumbnail in pixels, icons are drawn at most 4 times 32
+THUMBNAIL_SIZE = 128
+
+
+def scan_previews(prefab_dir, previews_dir):
+    """Returns dict mapping font name to preview image for every font file that has one.
+
+    Each folder is listed once. A font with several previews uses the one
+    whose extension comes first in font_import.PREVIEW_EXTENSIONS.
+    """
+
+    fonts = set()
+    with os.scandir(prefab_dir) as entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if ext == '.blend':
+                fonts.add(stem)
+
+    images = {}
+    with os.scandir(previews_dir) as entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            ext = ext.lower()
+            if stem in fonts and ext in font_import.PREVIEW_EXTENSIONS:
+                priority = font_import.PREVIEW_EXTENSIONS.index(ext)
+                if stem not in images or priority < images[stem][0]:
+                    images[stem] = (priority, entry.path)
+
+    return {name: path for name, (_, path) in images.items()}
+
+
+def tag_redraw():
+    """Redraws the 3D views, where the font panels are"""
+
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+class PreviewCache:
+    """Icons of font previews, made from cached thumbnails on demand.
+
+    icon_id returns 0 for a font whose thumbnail does not exist yet and
+    queues it. Thumbnails need bpy.data, which cannot be changed while
+    panels draw, so they are made one per timer tick, after which the 3D
+    views are redrawn. Fonts can be added, changed and removed while the
+    icons of the others stay loaded.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        # font name -> preview image path
+        self.sources = {}
+        self._pcoll = None
+        self._queue = []
+
+        # bound methods are new objects on every access, timers need the same one
+        self._timer = self._make_next
+
+    def set_sources(self, sources):
+        """Replaces the preview images, dropping loaded icons of fonts whose preview changed"""
+
+        for name, path in self.sources.items():
+            if sources.get(name) != path:
+                self.release(name)
+        self.sources = dict(sources)
+
+    def release(self, name):
+        """Unloads the icon of a font, it is loaded again from its current preview when drawn"""
+
+        if name in self._queue:
+            self._queue.remove(name)
+        if self._pcoll is not None and name in self._pcoll:
+            del self._pcoll[name]
+
+    def thumbnail_path(self, name):
+        """Returns the thumbnail path of a font for the current version of its preview"""
+
+        mtime = os.stat(self.sources[name]).st_mtime_ns
+        return os.path.join(self.cache_dir, f'{name}-{mtime}.png')
+
+    def icon_id(self, name):
+        """Returns the icon of a font's preview, 0 while its thumbnail is being made"""
+
+        if self._pcoll is not None and name in self._pcoll:
+            return self._pcoll[name].icon_id
+
+        if name not in self.sources:
+            return 0
+
+        try:
+            thumbnail = self.thumbnail_path(name)
+        except OSError:
+            return 0
+
+        if not os.path.exists(thumbnail):
+            if name not in self._queue:
+                self._queue.append(name)
+            if not bpy.app.timers.is_registered(self._timer):
+                bpy.app.timers.register(self._timer, first_interval=0)
+            return 0
+
+        if self._pcoll is None:
+            self._pcoll = bpy.utils.previews.new()
+        return self._pcoll.load(name, thumbnail, 'IMAGE').icon_id
+
+    def make_thumbnail(self, name):
+        """Writes the thumbnail of a font's preview, scaled down with Blender's image loader"""
+
+        source = self.sources[name]
+        thumbnail = self.thumbnail_path(name)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        image = bpy.data.images.load(source, check_existing=False)
+        try:
+            width, height = image.size
+            scale = THUMBNAIL_SIZE / max(width, height, 1)
+            if scale < 1:
+                image.scale(max(1, round(width * scale)), max(1, round(height * scale)))
+            image.filepath_raw = thumbnail
+            image.file_format = 'PNG'
+            image.save()
+        finally:
+            bpy.data.images.remove(image)
+
+        self.remove_thumbnails(name, keep=thumbnail)
+
+    def remove_thumbnails(self, name, keep=None):
+        """Deletes cached thumbnails of a font, except keep"""
+
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return
+
+        prefix = f'{name}-'
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if ext == '.png' and stem.startswith(prefix) and stem[len(prefix):].isdigit() \
+                    and entry.path != keep:
+                os.remove(entry.path)
+
+    def _make_next(self):
+        while self._queue:
+            name = self._queue.pop(0)
+            try:
+                self.make_thumbnail(name)
+            except Exception as e:
+                # drawn without an icon from now on
+                print(e)
+                self.sources.pop(name, None)
+                continue
+
+            tag_redraw()
+            break
+
+        return 0 if self._queue else None
+
+    def forget(self, name):
+        """Drops a removed font and its icon"""
+
+        self.sources.pop(name, None)
+        self.release(name)
+        self.remove_thumbnails(name)
+
+    def close(self):
+        if bpy.app.timers.is_registered(self._timer):
+            bpy.app.timers.unregister(self._timer)
+        self._queue.clear()
+        if self._pcoll is not None:
+            bpy.utils.previews.remove(self._pcoll)
+            self._pcoll = None
@@ -0,0 +1,230 @@
+"""Text layout helpers used by the text generator.
+
+Positions of all letters are computed up front from glyph metrics, so that
+objects can be placed by writing their location once instead of going
+through selection and transform operators.
+"""
+
+import numpy as np
+
+# width of a space in fonts without a space glyph, relative to the average letter
+SPACE_WIDTH = 0.5
+
+
+class LayoutTable:
+    """Advance widths, left bearings and kerning pairs of a font as arrays.
+
+    Letters are mapped to rows once, after that laying out a string is a few
+    array operations regardless of its length. Fonts without a space glyph
+    get an extra row for it, so words are still separated; rows at or above
+    glyph_count have no object.
+    """
+
+    def __init__(self, metrics):
+        glyphs = metrics['glyphs']
+        letters = sorted(glyphs)
+
+        self.index = {letter: i for i, letter in enumerate(letters)}
+        self.glyph_count = len(letters)
+        advances = [glyphs[l]['advance'] for l in letters]
+        bearings = [glyphs[l]['bbox_min'][0] for l in letters]
+
+        if ' ' not in self.index:
+            self.index[' '] = len(advances)
+            advances.append(SPACE_WIDTH * np.mean(advances) if advances else 0)
+            bearings.append(0)
+
+        self.advances = np.array(advances, dtype=np.float64)
+        self.bearings = np.array(bearings, dtype=np.float64)
+        self.vertical_axis = metrics.get('vertical_axis', 1)
+        self.height = metrics.get('height') or 1
+
+        self.kerning = np.zeros((len(advances), len(advances)), dtype=np.float64)
+        for a, pairs in metrics.get('kerning', {}).items():
+            row = self.index.get(a)
+            if row is None:
+                continue
+            for b, adjustment in pairs.items():
+                col = self.index.get(b)
+                if col is not None:
+                    self.kerning[row, col] = adjustment
+
+    def lookup(self, text):
+        """Returns glyph rows for every letter of text, -1 where the font has no glyph"""
+
+        return np.fromiter((self.index.get(letter, -1) for letter in text),
+                           dtype=np.int64, count=len(text))
+
+
+# font name -> (metrics, table), a font measured again replaces its table
+_tables = {}
+
+
+def layout_table(metrics):
+    """Returns the LayoutTable of a metrics dict, building it once"""
+
+    key = metrics.get('font')
+    cached = _tables.get(key)
+    if cached is not None and cached[0] is metrics:
+        return cached[1]
+
+    table = LayoutTable(metrics)
+    _tables[key] = (metrics, table)
+    return table
+
+
+def _layout_paragraph(paragraph, table, spacing, kerning, max_width):
+    """Lays out a paragraph without line breaks, wrapping it at spaces.
+
+    Returns (indices, xs, lines, widths): indices of the letters of the
+    paragraph that have a glyph object, their x location relative to the
+    start of their line, the line each of them is on and the width of every
+    line.
+    """
+
+    rows = table.lookup(paragraph)
+    positions = np.nonzero(rows >= 0)[0]
+    rows = rows[positions]
+    if not len(rows):
+        return positions, np.zeros(0), np.zeros(0, dtype=np.int64), [0.0]
+
+    step = table.advances[rows] + spacing
+    if kerning and len(rows) > 1:
+        step[:-1] += table.kerning[rows[:-1], rows[1:]]
+
+    pen = np.empty(len(rows))
+    pen[0] = 0
+    np.cumsum(step[:-1], out=pen[1:])
+    ends = pen + table.advances[rows]
+
+    spaces = rows == table.index[' ']
+    inked = np.nonzero(~spaces)[0]
+
+    # greedy wrapping, a line is broken before the first word that does not
+    # fit, trailing spaces stay on the line they follow
+    starts = [0]
+    if max_width > 0 and len(inked):
+        word_starts = inked[np.r_[True, np.diff(inked) > 1]]
+        word_ends = inked[np.r_[np.diff(inked) > 1, True]]
+        for first, last in zip(word_starts.tolist(), word_ends.tolist()):
+            if first != starts[-1] and ends[last] - pen[starts[-1]] > max_width:
+                starts.append(first)
+    starts = np.array(starts)
+
+    lines = np.searchsorted(starts, np.arange(len(rows)), side='right') - 1
+    xs = pen - pen[starts][lines] - table.bearings[rows]
+
+    # a line ends at the last letter that is not a space
+    widths = np.zeros(len(starts))
+    if len(inked):
+        last = inked[np.searchsorted(lines[inked], np.arange(len(starts)),
+                                     side='right') - 1]
+        found = lines[last] == np.arange(len(starts))
+        widths[found] = ends[last[found]] - pen[starts[found]]
+    widths = widths.tolist()
+
+    has_object = rows < table.glyph_count
+    return positions[has_object], xs[has_object], lines[has_object], widths
+
+
+def line_offsets(text, table, spacing, kerning=True):
+    """Lays out text on a single line in one pass.
+
+    Returns (indices, xs): indices of the letters of text that have a glyph
+    and the x location for the object of each of them. Locations are chosen
+    so that the ink of the first letter starts at 0.
+
+    text - the text to lay out
+    table - LayoutTable of the font
+    spacing - gap between two consecutive letters
+    kerning - apply the kerning pairs of the font
+    """
+
+    indices, xs, _, _ = _layout_paragraph(text, table, spacing, kerning, 0)
+    return indices, xs
+
+
+class TextLayout:
+    """Multi-line layout of text for one font and one set of layout options.
+
+    Text is split into paragraphs at new lines, paragraphs are wrapped at
+    max_width (0 disables wrapping) and lines are justified LEFT, CENTER or
+    RIGHT. Laid out paragraphs are remembered, so after an edit only the
+    paragraphs that changed are laid out again.
+
+    Results are cached per paragraph rather than per wrapped line: where a
+    line breaks depends on every word before it in its paragraph, so an edit
+    can move all the lines after it, and without wrapping every paragraph is
+    a single line anyway. Justification only shifts cached lines.
+    """
+
+    def __init__(self, table, spacing, kerning, max_width, line_height, align):
+        self.table = table
+        self.spacing = spacing
+        self.kerning = kerning
+        self.max_width = max_width
+        self.line_height = line_height
+        self.align = align
+
+        # paragraph text -> result of _layout_paragraph
+        self._paragraphs = {}
+
+    def layout(self, text):
+        """Returns (indices, xs, vs): indices of the letters of text that have a glyph
+        object and their location along the x axis and the vertical axis of the font.
+        """
+
+        used = {}
+        indices, xs, lines, widths = [], [], [], []
+        offset = 0
+        for paragraph in text.split('\n'):
+            result = self._paragraphs.get(paragraph)
+            if result is None:
+                result = _layout_paragraph(paragraph, self.table, self.spacing,
+                                           self.kerning, self.max_width)
+            used[paragraph] = result
+
+            indices.append(result[0] + offset)
+            xs.append(result[1])
+            lines.append(result[2] + len(widths))
+            widths.extend(result[3])
+            offset += len(paragraph) + 1
+
+        # forget paragraphs that are no longer in the text
+        self._paragraphs = used
+
+        indices = np.concatenate(indices)
+        lines = np.concatenate(lines)
+        widths = np.array(widths)
+
+        reference = self.max_width if self.max_width > 0 else widths.max()
+        if self.align == 'CENTER':
+            shift = (reference - widths) / 2
+        elif self.align == 'RIGHT':
+            shift = reference - widths
+        else:
+            shift = np.zeros(len(widths))
+
+        xs = np.concatenate(xs) + shift[lines]
+        vs = -lines * self.line_height * self.table.height
+        return indices, xs, vs
+
+
+# layout options -> TextLayout, so paragraphs are reused between generations
+_text_layouts = {}
+
+
+def text_layout(table, spacing, kerning=True, max_width=0, line_height=1.2, align='LEFT'):
+    """Returns the TextLayout for a font table and layout options"""
+
+    key = (id(table), spacing, kerning, max_width, line_height, align)
+    cached = _text_layouts.get(key)
+    if cached is not None and cached.table is table:
+        return cached
+
+    if len(_text_layouts) > 16:
+        _text_layouts.clear()
+
+    cached = TextLayout(table, spacing, kerning, max_width, line_height, align)
+    _text_layouts[key] = cached
+    return cached
@@ -0,0 +1,321 @@
+"""Glyph metrics stored next to font files.
+
+Every font file <font name>.blend can have a sidecar <font name>.metrics.json
+holding the bounding box, advance width and vertex count of each glyph, the
+height and vertical axis of the font and its kerning pairs. Layout,
+measuring and previews read the sidecar instead of opening the font file and
+evaluating its meshes.
+"""
+
+import json
+import os
+
+import bpy
+import numpy as np
+
+METRICS_VERSION = 3
+
+# number of horizontal bands glyph outlines are compared in for kerning
+KERNING_BANDS = 16
+
+# path -> (mtime, metrics), so a sidecar is parsed once per change
+_loaded = {}
+
+# collections of bpy.data a font file can bring in with its glyphs, in the
+# order they are removed, users come before what they use
+LOADED_DATA = ('objects', 'meshes', 'curves', 'materials', 'textures', 'images',
+               'node_groups')
+
+
+def metrics_path(font_path):
+    """Returns the sidecar path of a font file, <dir>/<font name>.metrics.json"""
+
+    return os.path.splitext(font_path)[0] + '.metrics.json'
+
+
+def glyph_letter(object_name, font_name):
+    """Returns the letter of a glyph object named <letter>-<font name>, or None"""
+
+    suffix = f'-{font_name}'
+    if object_name.endswith(suffix) and len(object_name) > len(suffix):
+        return object_name[:-len(suffix)]
+    return None
+
+
+def compute_glyph_metrics(obj):
+    """Returns the metrics of a single glyph object.
+
+    The bounding box is measured in the object's local axes with its scale
+    applied, which matches how copies of the glyph are placed in the scene.
+    """
+
+    scale = np.abs(np.array(obj.scale))
+
+    if obj.type == 'MESH' and len(obj.data.vertices) > 0:
+        vertex_count = len(obj.data.vertices)
+        co = np.empty(vertex_count * 3)
+        obj.data.vertices.foreach_get('co', co)
+        co.shape = (-1, 3)
+    else:
+        vertex_count = 0
+        co = np.array([tuple(c) for c in obj.bound_box])
+
+    bbox_min = co.min(axis=0) * scale
+    bbox_max = co.max(axis=0) * scale
+
+    return {
+        'bbox_min': bbox_min.tolist(),
+        'bbox_max': bbox_max.tolist(),
+        'advance': float(bbox_max[0] - bbox_min[0]),
+        'vertex_count': vertex_count,
+    }
+
+
+def _outline(obj, axis):
+    """Returns the (x, vertical) points as an (n, 2) array and the (m, 2) edges of a glyph,
+    scaled like the glyph.
+
+    axis - index of the vertical axis of the font, 1 for y or 2 for z
+    """
+
+    scale = np.array([abs(obj.scale[0]), abs(obj.scale[axis])])
+
+    if obj.type == 'MESH' and len(obj.data.vertices) > 0:
+        mesh = obj.data
+        co = np.empty(len(mesh.vertices) * 3)
+        mesh.vertices.foreach_get('co', co)
+        co.shape = (-1, 3)
+        edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+        mesh.edges.foreach_get('vertices', edges)
+        edges.shape = (-1, 2)
+    else:
+        co = np.array([tuple(c) for c in obj.bound_box])
+        edges = np.zeros((0, 2), dtype=np.int32)
+
+    return co[:, [0, axis]] * scale, edges
+
+
+def _profile(points, edges, left, advance, bottom, band_height):
+    """Returns the free space left and right of the ink of a glyph for every horizontal band.
+
+    Edges are sampled at least twice per band so that long edges without
+    vertices in a band still count. Bands without ink are NaN.
+    """
+
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    samples = [points]
+
+    if len(edges):
+        a, b = points[edges[:, 0]], points[edges[:, 1]]
+        steps = (np.abs(b[:, 1] - a[:, 1]) / band_height * 2).astype(np.int64) + 1
+
+        # steps - 1 samples between the ends of every edge, all at once
+        counts = steps - 1
+        edge = np.repeat(np.arange(len(edges)), counts)
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        t = (np.arange(len(edge)) - first + 1) / steps[edge]
+        samples.append(a[edge] + (b[edge] - a[edge]) * t[:, None])
+
+    samples = np.concatenate(samples)
+    bands = np.clip(((samples[:, 1] - bottom) / band_height).astype(np.int64),
+                    0, KERNING_BANDS - 1)
+
+    low = np.full(KERNING_BANDS, np.inf)
+    high = np.full(KERNING_BANDS, -np.inf)
+    np.minimum.at(low, bands, samples[:, 0])
+    np.maximum.at(high, bands, samples[:, 0])
+
+    empty = np.isinf(low)
+    left_space = np.where(empty, np.nan, low - left)
+    right_space = np.where(empty, np.nan, advance - (high - left))
+    return left_space, right_space
+
+
+def vertical_axis(glyphs):
+    """Returns the index of the axis letters of a font stand along.
+
+    Fonts can be modelled standing up (x/z) or lying down (x/y).
+    """
+
+    extent_y = sum(g['bbox_max'][1] - g['bbox_min'][1] for g in glyphs.values())
+    extent_z = sum(g['bbox_max'][2] - g['bbox_min'][2] for g in glyphs.values())
+    return 2 if extent_z > extent_y else 1
+
+
+def compute_kerning(glyph_objects, glyphs, axis):
+    """Returns kerning pairs as {left letter: {right letter: adjustment}}.
+
+    The adjustment moves the right glyph so that the closest parts of the
+    two glyphs, compared band by band, would touch. Letter spacing is then
+    the visible gap at that point, e.g. 'V' after 'A' is pulled closer than
+    two bounding boxes would allow.
+
+    glyph_objects - dict mapping letter to glyph object
+    glyphs - metrics of the same glyphs, as returned by compute_glyph_metrics
+    axis - vertical axis of the font
+    """
+
+    if not glyphs:
+        return {}
+
+    bottom = min(g['bbox_min'][axis] for g in glyphs.values())
+    top = max(g['bbox_max'][axis] for g in glyphs.values())
+    if top <= bottom:
+        return {}
+    band_height = (top - bottom) / KERNING_BANDS
+
+    letters = list(glyph_objects)
+
+    # (letters, bands) free space left and right of every glyph
+    lefts = np.empty((len(letters), KERNING_BANDS))
+    rights = np.empty((len(letters), KERNING_BANDS))
+    for i, letter in enumerate(letters):
+        points, edges = _outline(glyph_objects[letter], axis)
+        g = glyphs[letter]
+        lefts[i], rights[i] = _profile(points, edges, g['bbox_min'][0],
+                                       g['advance'], bottom, band_height)
+
+    # gap between every left glyph a and right glyph b in every band both
+    # have ink in, pairs without such a band are not kerned
+    gaps = rights[:, None, :] + lefts[None, :, :]
+    gaps = np.where(np.isnan(gaps), np.inf, gaps).min(axis=2)
+    advances = np.array([glyphs[letter]['advance'] for letter in letters])
+
+    # never move the right glyph back past the start of the left one
+    adjustments = np.maximum(-gaps, -advances[:, None])
+
+    threshold = (top - bottom) * 1e-3
+    kerning = {}
+    for a, b in zip(*np.nonzero(np.isfinite(gaps) & (np.abs(adjustments) > threshold))):
+        kerning.setdefault(letters[a], {})[letters[b]] = \
+            round(float(adjustments[a, b]), 5)
+
+    return kerning
+
+
+def _metrics_for(glyph_objects, font_name):
+    glyphs = {letter: compute_glyph_metrics(obj)
+              for letter, obj in glyph_objects.items()}
+
+    axis = vertical_axis(glyphs) if glyphs else 1
+    height = 0
+    if glyphs:
+        height = max(g['bbox_max'][axis] for g in glyphs.values()) - \
+            min(g['bbox_min'][axis] for g in glyphs.values())
+
+    return {'version': METRICS_VERSION, 'font': font_name, 'glyphs': glyphs,
+            'vertical_axis': axis, 'height': height,
+            'kerning': compute_kerning(glyph_objects, glyphs, axis)}
+
+
+def build_metrics(objects, font_name):
+    """Returns metrics and kerning pairs for all glyphs of font_name found in objects"""
+
+    glyph_objects = {}
+    for obj in objects:
+        letter = glyph_letter(obj.name, font_name)
+        if letter is not None:
+            glyph_objects[letter] = obj
+
+    return _metrics_for(glyph_objects, font_name)
+
+
+def loaded_data():
+    """Returns the pointers of the datablocks in every collection of LOADED_DATA"""
+
+    return {attr: {block.as_pointer() for block in getattr(bpy.data, attr)}
+            for attr in LOADED_DATA}
+
+
+def remove_loaded(before):
+    """Removes the datablocks added since loaded_data returned before that nothing uses.
+
+    Objects are removed whatever uses them, so glyphs appended from a font
+    file go away along with their meshes, curves and materials.
+    """
+
+    for attr in LOADED_DATA:
+        collection = getattr(bpy.data, attr)
+        for block in [b for b in collection if b.as_pointer() not in before[attr]]:
+            if attr == 'objects' or block.users == 0:
+                collection.remove(block)
+
+
+def build_metrics_from_file(font_path, font_name):
+    """Loads the glyphs of a font file, measures them and removes them again"""
+
+    before = loaded_data()
+    with bpy.data.libraries.load(font_path) as (data_from, data_to):
+        names = [name for name in data_from.objects
+                 if glyph_letter(name, font_name) is not None]
+        data_to.objects = names
+
+    # loaded objects may have been renamed if the font is already in use,
+    # so letters are taken from the requested names
+    glyph_objects = {glyph_letter(name, font_name): obj
+                     for name, obj in zip(names, data_to.objects)
+                     if obj is not None}
+
+    try:
+        return _metrics_for(glyph_objects, font_name)
+    finally:
+        remove_loaded(before)
+
+
+def write_metrics(path, metrics):
+    with open(path, 'w') as f:
+        json.dump(metrics, f, indent=1, sort_keys=True)
+
+    _loaded.pop(path, None)
+
+
+def load_metrics(path):
+    """Returns metrics stored in the sidecar at path, or None if there is none."""
+
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    cached = _loaded.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(path) as f:
+            metrics = json.load(f)
+    except (OSError, ValueError) as e:
+        print(e)
+        return None
+
+    if metrics.get('version') != METRICS_VERSION:
+        return None
+
+    _loaded[path] = (mtime, metrics)
+    return metrics
+
+
+def is_stale(font_path):
+    """True if the sidecar of a font file is missing or older than the font"""
+
+    path = metrics_path(font_path)
+    return not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(font_path)
+
+
+def ensure_metrics(font_path, font_name, write=True):
+    """Returns metrics of a font file, writing the sidecar first if it is missing or older than the font
+
+    write - store newly built metrics in the sidecar, otherwise they are only returned
+    """
+
+    path = metrics_path(font_path)
+    if not is_stale(font_path):
+        metrics = load_metrics(path)
+        if metrics is not None:
+            return metrics
+
+    metrics = build_metrics_from_file(font_path, font_name)
+    if write:
+        write_metrics(path, metrics)
+    return metrics
@@ -0,0 +1,391 @@
+"""Bounding boxes of objects for the align tools.
+
+Point coordinates are read with a single foreach_get per vertex or spline
+collection into numpy arrays, transformed with one matrix multiplication and
+reduced per axis, instead of building a Vector for every point.
+
+Local bounding boxes are cached per object until its data changes, world
+bounds are derived from them and the current matrix_world, so one align
+operation, and the slider updates that follow it, scan every object once.
+A depsgraph handler drops entries of objects whose geometry was edited.
+
+Bounds can also be measured on evaluated geometry, so modifiers and curve
+objects are taken into account.
+
+The world boxes of a whole selection are kept in a SelectionIndex, so the
+extent of the selection is looked up from flat arrays instead of scanning
+every object again.
+"""
+
+import bpy
+from bpy.app.handlers import persistent
+import numpy as np
+
+# (object pointer, space) -> (matrix key, data pointer, (low, high) or None)
+_cache = {}
+
+# object or data pointer -> cache keys that depend on it
+_dependents = {}
+
+
+def coordinates(obj):
+    """Returns (co, w) for the points of a MESH, SURFACE or FONT object, or (None, None).
+
+    co - (n, 3) array of local point coordinates
+    w - (n,) array of homogeneous weights, 1 except for SURFACE points
+    """
+
+    me = obj.data
+
+    if obj.type == 'MESH' and len(me.vertices) > 0:
+        co = np.empty(len(me.vertices) * 3)
+        me.vertices.foreach_get('co', co)
+        co.shape = (-1, 3)
+        return co, np.ones(len(co))
+
+    if obj.type == 'SURFACE' and len(me.splines) > 0:
+        parts = []
+        for s in me.splines:
+            co = np.empty(len(s.points) * 4)
+            s.points.foreach_get('co', co)
+            parts.append(co.reshape(-1, 4))
+        co = np.concatenate(parts)
+        if len(co):
+            return co[:, :3], co[:, 3]
+
+    elif obj.type == 'FONT' and len(me.splines) > 0:
+        parts = []
+        for s in me.splines:
+            co = np.empty(len(s.bezier_points) * 3)
+            s.bezier_points.foreach_get('co', co)
+            parts.append(co.reshape(-1, 3))
+        co = np.concatenate(parts)
+        if len(co):
+            return co, np.ones(len(co))
+
+    return None, None
+
+
+def to_world(co, w, matrix):
+    """Applies a 4x4 matrix to points with homogeneous weights w"""
+
+    m = np.array(matrix)
+    return co @ m[:3, :3].T + np.outer(w, m[:3, 3])
+
+
+def box(obj, space):
+    """Returns (low, high) corners of the bounding box of an object's points, or None if it has none.
+
+    space - "global" for bounds in world space, "local" for bounds in the
+    object's own space
+    """
+
+    co, w = coordinates(obj)
+    if co is None:
+        return None
+
+    if space == "global":
+        co = to_world(co, w, obj.matrix_world)
+    return co.min(axis=0), co.max(axis=0)
+
+
+def transform_box(low, high, matrix):
+    """Returns the world space (low, high) of a local box from its 8 corners"""
+
+    corners = np.array([(x, y, z) for x in (low[0], high[0])
+                        for y in (low[1], high[1])
+                        for z in (low[2], high[2])])
+    corners = to_world(corners, np.ones(8), matrix)
+    return corners.min(axis=0), corners.max(axis=0)
+
+
+def _points(obj, bounds):
+    if bounds is None:
+        # otherwise use the pivot object
+        low = high = np.array(obj.matrix_world.translation)
+    else:
+        low, high = bounds
+
+    center = low + (high - low) / 2
+
+    return [float(low[0]), float(center[0]), float(high[0]),
+            float(low[1]), float(center[1]), float(high[1]),
+            float(low[2]), float(center[2]), float(high[2])]
+
+
+def reference_points(obj, space):
+    """Returns [min_x, center_x, max_x, min_y, center_y, max_y, min_z, center_z, max_z].
+
+    space - "global" for bounds in world space, "local" for bounds in the
+    object's own space. Objects without points use their pivot.
+    """
+
+    return _points(obj, box(obj, space))
+
+
+def _matrix_key(obj, space):
+    if space != "global":
+        return None
+    return tuple(v for row in obj.matrix_world for v in row)
+
+
+def needs_evaluation(obj):
+    """True if the evaluated geometry of obj can differ from its own data"""
+
+    return len(obj.modifiers) > 0 or obj.type in {'CURVE', 'FONT'}
+
+
+def evaluated_box(obj, depsgraph, space):
+    """Same as box, measuring the geometry after modifiers from depsgraph.
+
+    Local bounds come from the evaluated bounding box, world bounds from the
+    points of the evaluated mesh.
+    """
+
+    obj_eval = obj.evaluated_get(depsgraph)
+
+    if space == "global":
+        mesh = obj_eval.to_mesh()
+        try:
+            if mesh is None or not len(mesh.vertices):
+                return None
+            co = np.empty(len(mesh.vertices) * 3)
+            mesh.vertices.foreach_get('co', co)
+            co.shape = (-1, 3)
+        finally:
+            obj_eval.to_mesh_clear()
+
+        # the original matrix is current even if the depsgraph is not
+        co = to_world(co, np.ones(len(co)), obj.matrix_world)
+        return co.min(axis=0), co.max(axis=0)
+
+    corners = np.array([tuple(c) for c in obj_eval.bound_box])
+    return corners.min(axis=0), corners.max(axis=0)
+
+
+def _cached_box(obj, space, depsgraph=None):
+    """Same as box, reusing the result while the object's data and, for world space, matrix are unchanged.
+
+    depsgraph - measure evaluated geometry instead of the object's data
+    """
+
+    kind = space if depsgraph is None else f'evaluated {space}'
+    key = (obj.as_pointer(), kind)
+    data = obj.data.as_pointer() if obj.data is not None else 0
+    matrix = _matrix_key(obj, space)
+
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == matrix and entry[1] == data:
+        return entry[2]
+
+    if depsgraph is None:
+        bounds = box(obj, space)
+    else:
+        bounds = evaluated_box(obj, depsgraph, space)
+
+    _cache[key] = (matrix, data, bounds)
+    _dependents.setdefault(key[0], set()).add(key)
+    if data:
+        _dependents.setdefault(data, set()).add(key)
+
+    return bounds
+
+
+def cached_reference_points(obj, space, exact=False, depsgraph=None):
+    """Same as reference_points, using cached bounds.
+
+    World space bounds are derived from the cached local box and the current
+    matrix_world, which is exact unless the object is rotated, where it can
+    be larger than the points themselves. exact - scan the points in world
+    space instead, cached until the matrix changes.
+
+    depsgraph - measure geometry with modifiers applied, objects whose
+    evaluated geometry is the same as their data use the raw bounds
+    """
+
+    if depsgraph is not None and not needs_evaluation(obj):
+        depsgraph = None
+
+    if space == "global" and not exact:
+        bounds = _cached_box(obj, "local", depsgraph)
+        if bounds is not None:
+            bounds = transform_box(bounds[0], bounds[1], obj.matrix_world)
+    else:
+        bounds = _cached_box(obj, space, depsgraph)
+
+    return _points(obj, bounds)
+
+
+def world_box(obj, exact=False, depsgraph=None):
+    """Returns the world space (low, high) of an object from cached bounds, its pivot if it has no points"""
+
+    points = cached_reference_points(obj, "global", exact, depsgraph)
+    return np.array(points[0::3]), np.array(points[2::3])
+
+
+class SelectionIndex:
+    """World bounding boxes of a set of objects as flat (n, 3) arrays.
+
+    The extent of all boxes is kept up to date, so the min, center and max
+    of the selection are read without touching the objects. The depsgraph
+    handler only marks the rows of objects that move or change, they are
+    measured again when the index is next used.
+
+    exact, depsgraph - how boxes are measured, as in cached_reference_points
+    """
+
+    def __init__(self, objects, exact=False, depsgraph=None):
+        self.objects = list(objects)
+        self.exact = exact
+        self.evaluated = depsgraph is not None
+        self.rows = {obj.as_pointer(): i for i, obj in enumerate(self.objects)}
+        # rows measured before their object last changed
+        self.dirty = set()
+
+        self.low = np.zeros((len(self.objects), 3))
+        self.high = np.zeros((len(self.objects), 3))
+        for i, obj in enumerate(self.objects):
+            self.low[i], self.high[i] = world_box(obj, exact, depsgraph)
+
+        self._update_extent()
+
+    def _update_extent(self):
+        if len(self.objects):
+            self._extent = (self.low.min(axis=0), self.high.max(axis=0))
+        else:
+            self._extent = None
+
+    def mark_dirty(self, objects):
+        """Marks the objects of the index among objects to be measured again"""
+
+        for obj in objects:
+            row = self.rows.get(obj.as_pointer())
+            if row is not None:
+                self.dirty.add(row)
+
+    def refresh(self, depsgraph=None):
+        """Measures the rows marked dirty again"""
+
+        if not self.dirty:
+            return
+
+        for row in self.dirty:
+            self.low[row], self.high[row] = world_box(
+                self.objects[row], self.exact, depsgraph if self.evaluated else None)
+        self.dirty.clear()
+        self._update_extent()
+
+    def shift(self, offset):
+        """Moves every box by offset, for when the whole selection was moved together"""
+
+        offset = np.asarray(offset, dtype=np.float64)
+        self.low += offset
+        self.high += offset
+        if self._extent is not None:
+            self._extent = (self._extent[0] + offset, self._extent[1] + offset)
+
+    def extent(self):
+        """Returns (low, high) of all boxes, or None for an empty index"""
+
+        return self._extent
+
+    def center(self):
+        if self._extent is None:
+            return None
+        low, high = self._extent
+        return low + (high - low) / 2
+
+
+# (object pointers, exact, evaluated) and index of the last aligned selection
+_selection = [None, None]
+
+
+def selection_index(objects, exact=False, depsgraph=None):
+    """Returns the SelectionIndex of objects, reusing the last one while the selection is the same.
+
+    Rows of a reused index whose objects changed since are measured here.
+    """
+
+    objects = list(objects)
+    key = (tuple(obj.as_pointer() for obj in objects), exact, depsgraph is not None)
+    if _selection[0] == key:
+        _selection[1].refresh(depsgraph)
+        return _selection[1]
+
+    _selection[1] = SelectionIndex(objects, exact, depsgraph)
+    _selection[0] = key
+    return _selection[1]
+
+
+def invalidate(id_data):
+    """Forgets cached bounds of an object, or of every object using a mesh or curve"""
+
+    for key in _dependents.pop(id_data.as_pointer(), ()):
+        _cache.pop(key, None)
+
+
+def clear():
+    _cache.clear()
+    _dependents.clear()
+    _selection[:] = [None, None]
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph=None):
+    # blender 2.80 passes only the scene
+    if depsgraph is None:
+        if hasattr(bpy.context, 'evaluated_depsgraph_get'):
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+        else:
+            depsgraph = bpy.context.depsgraph
+
+    changed = []
+    for update in depsgraph.updates:
+        if update.is_updated_geometry:
+            invalidate(update.id.original)
+
+        if isinstance(update.id, bpy.types.Object) and \
+                (update.is_updated_geometry or update.is_updated_transform):
+            changed.append(update.id.original)
+
+    # moved objects of the last aligned selection are measured again the
+    # next time it is aligned, not on every update
+    if _selection[1] is not None and changed:
+        _selection[1].mark_dirty(changed)
+
+
+@persistent
+def _on_load(*args):
+    # pointers of the previous file are meaningless now
+    clear()
+
+
+@persistent
+def _on_undo(*args):
+    # undo can restore objects at the same pointers with other transforms
+    # and meshes at the same pointers with other vertices
+    clear()
+
+
+def _remove_handler(handlers, func):
+    # handlers of a reloaded module are different function objects
+    for handler in list(handlers):
+        if getattr(handler, '__name__', None) == func.__name__ and \
+                getattr(handler, '__module__', None) == func.__module__:
+            handlers.remove(handler)
+
+
+def register():
+    unregister()
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    bpy.app.handlers.load_post.append(_on_load)
+    bpy.app.handlers.undo_post.append(_on_undo)
+    bpy.app.handlers.redo_post.append(_on_undo)
+
+
+def unregister():
+    _remove_handler(bpy.app.handlers.depsgraph_update_post, _on_depsgraph_update)
+    _remove_handler(bpy.app.handlers.load_post, _on_load)
+    _remove_handler(bpy.app.handlers.undo_post, _on_undo)
+    _remove_handler(bpy.app.handlers.redo_post, _on_undo)
+    clear()
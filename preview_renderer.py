@@ -0,0 +1,169 @@
+"""Rendering preview images of fonts that do not come with one.
+
+A sample text is laid out from the font's metrics with the same code as
+the text generator, rendered with Workbench through an orthographic camera
+framing the letters, and saved as a small PNG. Everything happens in a
+temporary scene that is removed afterwards along with the glyphs loaded
+for it, and nothing is written next to the font, so this also runs in
+background mode; tools/render_previews.py runs it over a whole folder.
+"""
+
+import math
+import os
+
+import bpy
+import numpy as np
+
+from . import font_import
+from . import font_library
+from . import glyph_layout
+from . import glyph_metrics
+from . import object_bounds
+from . import word_objects
+
+SAMPLE_TEXT = 'Aa Bb Cc'
+
+# width and height of rendered previews in pixels
+PREVIEW_SIZE = (256, 128)
+
+# letter spacing relative to the font height
+SAMPLE_SPACING = 0.05
+
+
+def existing_preview(font_path, output_dir):
+    """Returns the preview of a font in output_dir, or None"""
+
+    name = os.path.splitext(os.path.basename(font_path))[0]
+    for ext in font_import.PREVIEW_EXTENSIONS:
+        path = os.path.join(output_dir, name + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def needs_preview(font_path, output_dir):
+    """True if the font has no preview in output_dir or its preview is older than the font"""
+
+    preview = existing_preview(font_path, output_dir)
+    return preview is None or os.path.getmtime(preview) < os.path.getmtime(font_path)
+
+
+def _sample(metrics, sample):
+    # letters the font does not have are left out, a font without any of
+    # them shows its first glyphs instead
+    letters = metrics['glyphs']
+    text = ''.join(letter for letter in sample if letter in letters or letter == ' ')
+    if not text.strip():
+        text = ''.join(sorted(letters)[:8])
+    return text.strip()
+
+
+def _frame(camera, low, high, axis, size):
+    """Points an orthographic camera at the box from low to high.
+
+    Fonts standing on the z axis are seen from the front, fonts lying in
+    the x/y plane from above.
+    """
+
+    center = (low + high) / 2
+    extent = high - low
+    distance = float(extent.max()) + 10
+
+    if axis == 2:
+        camera.location = (center[0], low[1] - distance, center[2])
+        camera.rotation_euler = (math.pi / 2, 0, 0)
+    else:
+        camera.location = (center[0], center[1], high[2] + distance)
+        camera.rotation_euler = (0, 0, 0)
+
+    aspect = size[0] / size[1]
+    camera.data.type = 'ORTHO'
+    camera.data.ortho_scale = 1.1 * max(extent[0], extent[axis] * aspect, 1e-3)
+    camera.data.clip_end = distance * 2 + float(extent.max())
+
+
+def render_preview(font_path, preview_path, sample=SAMPLE_TEXT, size=PREVIEW_SIZE):
+    """Renders sample text set in a font to a PNG at preview_path"""
+
+    font_name = os.path.splitext(os.path.basename(font_path))[0]
+    metrics = glyph_metrics.ensure_metrics(font_path, font_name, write=False)
+    text = _sample(metrics, sample)
+    if not text:
+        raise ValueError(f'{font_name} has no glyphs')
+
+    before = glyph_metrics.loaded_data()
+    font_library.library.ensure_glyphs(font_path, font_name, set(text))
+    glyphs = {letter: bpy.data.objects.get(f'{letter}-{font_name}') for letter in set(text)}
+    glyphs = {letter: obj for letter, obj in glyphs.items() if obj is not None}
+
+    table = glyph_layout.layout_table(metrics)
+    layout = glyph_layout.text_layout(table, SAMPLE_SPACING * table.height)
+    indices, xs, vs = layout.layout(text)
+    axis = table.vertical_axis
+
+    scene = bpy.data.scenes.new(f'{font_name} preview')
+    word = word_objects.build_word(text, font_name, glyphs, (indices, xs, vs, axis), True)
+    scene.collection.children.link(word)
+
+    camera = bpy.data.objects.new(f'{font_name} preview camera',
+                                  bpy.data.cameras.new(f'{font_name} preview camera'))
+    scene.collection.objects.link(camera)
+    scene.camera = camera
+
+    try:
+        # world matrices of the new letters are only set by an evaluation
+        scene.view_layers[0].update()
+
+        boxes = [object_bounds.box(obj, "global") for obj in word.objects]
+        boxes = [b for b in boxes if b is not None]
+        if not boxes:
+            raise ValueError(f'{font_name} has no geometry')
+        low = np.min([b[0] for b in boxes], axis=0)
+        high = np.max([b[1] for b in boxes], axis=0)
+        _frame(camera, low, high, axis, size)
+
+        scene.render.engine = 'BLENDER_WORKBENCH'
+        scene.render.resolution_x, scene.render.resolution_y = size
+        scene.render.resolution_percentage = 100
+        scene.render.film_transparent = True
+        scene.render.image_settings.file_format = 'PNG'
+        scene.render.image_settings.color_mode = 'RGBA'
+        scene.render.filepath = preview_path
+
+        bpy.ops.render.render(write_still=True, scene=scene.name)
+    finally:
+        bpy.data.collections.remove(word)
+        camera_data = camera.data
+        bpy.data.objects.remove(camera)
+        bpy.data.cameras.remove(camera_data)
+        bpy.data.scenes.remove(scene)
+
+        # letters, glyphs appended for the preview and their data
+        glyph_metrics.remove_loaded(before)
+
+
+def render_one(font_path, output_dir, sample=SAMPLE_TEXT, size=PREVIEW_SIZE):
+    """Renders the preview of a font if it needs one, returns 'rendered', 'skipped' or 'failed'"""
+
+    name = os.path.splitext(os.path.basename(font_path))[0]
+    if not needs_preview(font_path, output_dir):
+        return 'skipped'
+
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        render_preview(font_path, os.path.join(output_dir, f'{name}.png'), sample, size)
+        return 'rendered'
+    except Exception as e:
+        print(f'{name}: {e}')
+        return 'failed'
+
+
+def render_missing(font_paths, output_dir, sample=SAMPLE_TEXT, size=PREVIEW_SIZE):
+    """Renders previews of the fonts that need one, returns (rendered, skipped, failed) names"""
+
+    results = {'rendered': [], 'skipped': [], 'failed': []}
+    for font_path in font_paths:
+        name = os.path.splitext(os.path.basename(font_path))[0]
+        results[render_one(font_path, output_dir, sample, size)].append(name)
+
+    return results['rendered'], results['skipped'], results['failed']
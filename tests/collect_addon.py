@@ -0,0 +1,12 @@
+"""Pytest plugin collecting the add-on folder as a plain directory.
+
+The repository root is the add-on package, its __init__ imports bpy, so it
+must not be imported as a package when the tests are collected.
+"""
+
+import pytest
+
+
+def pytest_collect_directory(path, parent):
+    if path == parent.config.rootpath:
+        return pytest.Dir.from_parent(parent, path=path)
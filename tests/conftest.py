@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the modules under test do not need blender, they are imported on their own
+# instead of through the add-on package, whose __init__ imports bpy
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
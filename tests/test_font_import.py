@@ -0,0 +1,156 @@
+import os
+
+import pytest
+
+import font_import
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+    return str(path)
+
+
+@pytest.fixture
+def addon(tmp_path):
+    prefab_dir = tmp_path / 'addon' / 'styles'
+    preview_dir = tmp_path / 'addon' / 'previews'
+    prefab_dir.mkdir(parents=True)
+    preview_dir.mkdir(parents=True)
+    manifest = font_import.ImportManifest(str(tmp_path / 'data' / 'manifest.json'),
+                                          str(tmp_path / 'addon'))
+    return manifest, str(prefab_dir), str(preview_dir)
+
+
+def test_scan_pairs_fonts_with_previews(tmp_path):
+    write(tmp_path / 'a.blend', 'a')
+    write(tmp_path / 'a.jpg', 'a')
+    write(tmp_path / 'a.png', 'a')
+    write(tmp_path / 'b.blend', 'b')
+    write(tmp_path / 'sub' / 'c.blend', 'c')
+    write(tmp_path / 'sub' / 'c.PNG', 'c')
+    write(tmp_path / 'c.png', 'preview of another folder')
+    write(tmp_path / '.hidden' / 'd.blend', 'd')
+
+    sources = font_import.scan_fonts(str(tmp_path))
+
+    assert [(s.name, s.preview) for s in sources] == [
+        ('a', str(tmp_path / 'a.png')),
+        ('b', None),
+        ('c', str(tmp_path / 'sub' / 'c.PNG')),
+    ]
+    assert [s.name for s in font_import.scan_fonts(str(tmp_path), recursive=False)] == \
+        ['a', 'b']
+
+
+def test_manifest_skips_unchanged_files(tmp_path, addon):
+    manifest, prefab_dir, preview_dir = addon
+    pairs = [(write(tmp_path / 'src' / 'a.blend', 'font'),
+              write(tmp_path / 'src' / 'a.png', 'preview'))]
+
+    report, fonts = font_import.import_fonts(pairs, manifest, prefab_dir, preview_dir)
+    assert report.added == ['a']
+    assert fonts == [(pairs[0][0], os.path.join(prefab_dir, 'a.blend'),
+                      os.path.join(preview_dir, 'a.png'))]
+
+    # a new manifest reads the records saved by the import
+    manifest = font_import.ImportManifest(manifest.path, manifest.root)
+    report, fonts = font_import.import_fonts(pairs, manifest, prefab_dir, preview_dir)
+    assert report.skipped == ['a'] and fonts == []
+
+    # touched without changing the content, found out by its hash
+    os.utime(pairs[0][0], (0, 0))
+    report, fonts = font_import.import_fonts(pairs, manifest, prefab_dir, preview_dir)
+    assert report.skipped == ['a'] and fonts == []
+
+
+def test_changed_files_are_updated(tmp_path, addon):
+    manifest, prefab_dir, preview_dir = addon
+    font = write(tmp_path / 'src' / 'a.blend', 'font')
+    preview = write(tmp_path / 'src' / 'a.png', 'preview')
+    font_import.import_fonts([(font, preview)], manifest, prefab_dir, preview_dir)
+
+    write(font, 'new font')
+    os.utime(font, (1, 1))
+    report, fonts = font_import.import_fonts([(font, preview)], manifest, prefab_dir,
+                                             preview_dir)
+
+    assert report.updated == ['a'] and len(fonts) == 1
+    with open(os.path.join(prefab_dir, 'a.blend')) as f:
+        assert f.read() == 'new font'
+
+
+def test_new_preview_type_replaces_the_old_one(tmp_path, addon):
+    manifest, prefab_dir, preview_dir = addon
+    font = write(tmp_path / 'src' / 'a.blend', 'font')
+    font_import.import_fonts([(font, write(tmp_path / 'src' / 'a.jpg', 'jpg'))],
+                             manifest, prefab_dir, preview_dir)
+
+    report, fonts = font_import.import_fonts(
+        [(font, write(tmp_path / 'src' / 'a.png', 'png'))], manifest, prefab_dir, preview_dir)
+
+    assert report.updated == ['a']
+    assert os.listdir(preview_dir) == ['a.png']
+    assert manifest.content_hash(os.path.join(preview_dir, 'a.jpg')) is None
+
+
+def test_same_content_is_a_duplicate(tmp_path, addon):
+    manifest, prefab_dir, preview_dir = addon
+    pairs = [(write(tmp_path / 'src' / 'a.blend', 'font'),
+              write(tmp_path / 'src' / 'a.png', 'a')),
+             (write(tmp_path / 'src' / 'b.blend', 'font'),
+              write(tmp_path / 'src' / 'b.png', 'b'))]
+
+    report, fonts = font_import.import_fonts(pairs, manifest, prefab_dir, preview_dir)
+
+    assert report.added == ['a']
+    assert report.duplicates == [('b', 'styles/a.blend')]
+    assert sorted(os.listdir(prefab_dir)) == ['a.blend']
+
+
+def test_same_name_in_two_folders_is_a_conflict(tmp_path, addon):
+    manifest, prefab_dir, preview_dir = addon
+    first = write(tmp_path / 'src' / 'one' / 'a.blend', 'first')
+    second = write(tmp_path / 'src' / 'two' / 'a.blend', 'second')
+    pairs = [(first, write(tmp_path / 'src' / 'one' / 'a.png', '1')),
+             (second, write(tmp_path / 'src' / 'two' / 'a.png', '2'))]
+
+    report, fonts = font_import.import_fonts(pairs, manifest, prefab_dir, preview_dir)
+
+    assert report.added == ['a']
+    assert report.conflicts == [(second, first)]
+    with open(os.path.join(prefab_dir, 'a.blend')) as f:
+        assert f.read() == 'first'
+
+
+def test_background_import_matches_import_fonts(tmp_path, addon):
+    manifest, prefab_dir, preview_dir = addon
+    pairs = [(write(tmp_path / 'src' / f'{i}.blend', f'font {i % 5}'),
+              write(tmp_path / 'src' / f'{i}.png', f'preview {i}'))
+             for i in range(10)]
+
+    job = font_import.BackgroundImport(pairs, manifest, prefab_dir, preview_dir, workers=3)
+    while not job.poll():
+        pass
+
+    assert job.done == job.total == 10
+    assert len(job.report.added) == 5 and len(job.report.duplicates) == 5
+    assert len(job.fonts) == 5
+    assert os.path.exists(manifest.path)
+
+
+def test_cancelled_import_saves_the_manifest(tmp_path, addon):
+    manifest, prefab_dir, preview_dir = addon
+    pairs = [(write(tmp_path / 'src' / f'{i}.blend', f'font {i}'),
+              write(tmp_path / 'src' / f'{i}.png', f'preview {i}'))
+             for i in range(20)]
+
+    job = font_import.BackgroundImport(pairs, manifest, prefab_dir, preview_dir, workers=1)
+    job.cancel()
+
+    # every font that was copied is recorded, the rest is imported next time
+    saved = font_import.ImportManifest(manifest.path, manifest.root)
+    assert len(job.fonts) == len(os.listdir(prefab_dir))
+    assert sorted(k for k in saved.records if k.startswith('styles/')) == \
+        sorted(f'styles/{name}' for name in os.listdir(prefab_dir))
@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+import glyph_layout
+
+
+def make_metrics(advances, kerning=None, bearings=None, height=2.0, font='test'):
+    bearings = bearings or {}
+    glyphs = {}
+    for letter, advance in advances.items():
+        left = bearings.get(letter, 0.0)
+        glyphs[letter] = {'bbox_min': [left, 0.0, 0.0],
+                          'bbox_max': [left + advance, 0.0, height],
+                          'advance': advance, 'vertical_axis': 2}
+    return {'font': font, 'glyphs': glyphs, 'vertical_axis': 2, 'height': height,
+            'kerning': kerning or {}}
+
+
+@pytest.fixture
+def table():
+    metrics = make_metrics({'A': 1.0, 'V': 1.0, 'i': 0.25, 'o': 0.5},
+                           kerning={'A': {'V': -0.25}}, bearings={'o': 0.125})
+    return glyph_layout.LayoutTable(metrics)
+
+
+def test_advances_and_spacing(table):
+    indices, xs = glyph_layout.line_offsets('AiA', table, 0.5, kerning=False)
+
+    assert indices.tolist() == [0, 1, 2]
+    assert xs.tolist() == [0.0, 1.5, 2.25]
+
+
+def test_left_bearing_is_subtracted(table):
+    _, xs = glyph_layout.line_offsets('Ao', table, 0.0)
+
+    assert xs.tolist() == [0.0, 1.0 - 0.125]
+
+
+def test_kerning_pairs(table):
+    _, kerned = glyph_layout.line_offsets('AVA', table, 0.5)
+    _, plain = glyph_layout.line_offsets('AVA', table, 0.5, kerning=False)
+
+    assert plain.tolist() == [0.0, 1.5, 3.0]
+    # only the A-V pair is kerned, the letters after it move with it
+    assert kerned.tolist() == [0.0, 1.25, 2.75]
+
+
+def test_letters_without_glyph_are_skipped(table):
+    indices, xs = glyph_layout.line_offsets('A?A', table, 0.0)
+
+    assert indices.tolist() == [0, 2]
+    assert xs.tolist() == [0.0, 1.0]
+
+
+def test_space_without_glyph_gets_a_width(table):
+    indices, xs = glyph_layout.line_offsets('A A', table, 0.0)
+
+    # the space has no object, it only separates the words
+    space = glyph_layout.SPACE_WIDTH * np.mean([1.0, 1.0, 0.25, 0.5])
+    assert indices.tolist() == [0, 2]
+    assert xs[1] == pytest.approx(1.0 + space)
+
+
+def test_lines_wrap_at_spaces():
+    # spaces are half as wide as the average letter
+    metrics = make_metrics({'A': 1.0})
+    layout = glyph_layout.TextLayout(glyph_layout.LayoutTable(metrics), 0.0, True,
+                                     2.5, 1.5, 'LEFT')
+
+    indices, xs, vs = layout.layout('AA AA A')
+
+    assert indices.tolist() == [0, 1, 3, 4, 6]
+    assert xs.tolist() == [0.0, 1.0, 0.0, 1.0, 0.0]
+    # lines go down by line height times font height
+    assert vs.tolist() == [0.0, 0.0, -3.0, -3.0, -6.0]
+
+
+def test_long_word_stays_on_its_own_line():
+    metrics = make_metrics({'A': 1.0})
+    layout = glyph_layout.TextLayout(glyph_layout.LayoutTable(metrics), 0.0, True,
+                                     1.5, 1.0, 'LEFT')
+
+    _, xs, vs = layout.layout('AAAA A')
+
+    assert xs.tolist() == [0.0, 1.0, 2.0, 3.0, 0.0]
+    assert vs.tolist() == [0.0, 0.0, 0.0, 0.0, -2.0]
+
+
+def test_paragraphs_and_justification():
+    metrics = make_metrics({'A': 1.0})
+    table = glyph_layout.LayoutTable(metrics)
+
+    indices, xs, vs = glyph_layout.TextLayout(table, 0.0, True, 0, 1.0, 'CENTER') \
+        .layout('AAA\nA')
+    assert indices.tolist() == [0, 1, 2, 4]
+    assert xs.tolist() == [0.0, 1.0, 2.0, 1.0]
+    assert vs.tolist() == [0.0, 0.0, 0.0, -2.0]
+
+    _, xs, _ = glyph_layout.TextLayout(table, 0.0, True, 0, 1.0, 'RIGHT').layout('AAA\nA')
+    assert xs.tolist() == [0.0, 1.0, 2.0, 2.0]
+
+
+def test_space_glyphs_get_objects():
+    table = glyph_layout.LayoutTable(make_metrics({'A': 1.0, ' ': 0.75}))
+
+    indices, xs = glyph_layout.line_offsets('A A', table, 0.0)
+
+    assert indices.tolist() == [0, 1, 2]
+    assert xs.tolist() == [0.0, 1.0, 1.75]
+
+
+def test_empty_paragraphs():
+    table = glyph_layout.LayoutTable(make_metrics({'A': 1.0}))
+
+    indices, xs, vs = glyph_layout.text_layout(table, 0.0).layout('A\n\nA')
+
+    assert indices.tolist() == [0, 3]
+    assert vs.tolist() == [0.0, -4.8]
+
+
+def test_changed_paragraphs_are_laid_out_again(table):
+    layout = glyph_layout.TextLayout(table, 0.5, True, 0, 1.0, 'LEFT')
+    layout.layout('AV\nAi')
+    first = layout._paragraphs['AV']
+
+    indices, xs, _ = layout.layout('AV\nAo')
+
+    assert layout._paragraphs['AV'] is first
+    assert 'Ai' not in layout._paragraphs
+    assert indices.tolist() == [0, 1, 3, 4]
+
+
+def test_layout_table_is_cached_per_font():
+    metrics = make_metrics({'A': 1.0}, font='cached')
+    table = glyph_layout.layout_table(metrics)
+
+    assert glyph_layout.layout_table(metrics) is table
+
+    # a font measured again replaces its table
+    remeasured = make_metrics({'A': 2.0}, font='cached')
+    assert glyph_layout.layout_table(remeasured) is not table
+    assert glyph_layout.layout_table(remeasured).advances.tolist() == [2.0, 1.0]
@@ -0,0 +1,154 @@
+import pytest
+
+import update_scheduler
+
+
+class Timers:
+    """Stands in for bpy.app.timers, timers run when the test calls run"""
+
+    def __init__(self):
+        self.registered = []
+
+    def register(self, func, first_interval=0):
+        self.registered.append(func)
+
+    def is_registered(self, func):
+        return func in self.registered
+
+    def unregister(self, func):
+        self.registered.remove(func)
+
+    def run(self):
+        for func in list(self.registered):
+            if func() is None:
+                self.registered.remove(func)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(update_scheduler, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def timers():
+    return Timers()
+
+
+@pytest.fixture
+def scheduler(clock, timers):
+    return update_scheduler.UpdateScheduler(interval=0.05, settle=0.25, timers=timers)
+
+
+def recorder(calls, name):
+    return lambda final: calls.append((name, final))
+
+
+def test_requests_are_coalesced(clock, timers, scheduler):
+    calls = []
+    scheduler.request('spacing', recorder(calls, 'first'))
+    scheduler.request('spacing', recorder(calls, 'second'))
+    assert len(timers.registered) == 1
+
+    timers.run()
+    assert calls == [('second', False)]
+
+    # nothing new was requested, the update is not run again before it settles
+    clock.now += 0.1
+    timers.run()
+    assert calls == [('second', False)]
+
+    # the latest request already ran, settling does not run it again
+    clock.now += 0.2
+    timers.run()
+    assert calls == [('second', False)]
+    assert timers.registered == []
+
+
+def test_request_after_the_last_run_settles_as_final(clock, timers, scheduler):
+    calls = []
+    scheduler.request('spacing', recorder(calls, 'first'))
+    timers.run()
+
+    clock.now += 0.01
+    scheduler.request('spacing', recorder(calls, 'second'))
+    clock.now += 0.3
+    timers.run()
+
+    assert calls == [('first', False), ('second', True)]
+    assert timers.registered == []
+
+
+def test_updates_run_at_most_once_per_interval(clock, timers, scheduler):
+    calls = []
+    scheduler.request('align', recorder(calls, 'a'))
+    timers.run()
+
+    clock.now += 0.01
+    scheduler.request('align', recorder(calls, 'b'))
+    timers.run()
+    assert calls == [('a', False)]
+
+    clock.now += 0.05
+    timers.run()
+    assert calls == [('a', False), ('b', False)]
+
+
+def test_cancel_one_key_keeps_the_others(clock, timers, scheduler):
+    calls = []
+    scheduler.request('align', recorder(calls, 'align'))
+    scheduler.request('spacing', recorder(calls, 'spacing'))
+
+    scheduler.cancel('align')
+    assert len(timers.registered) == 1
+
+    clock.now += 0.3
+    timers.run()
+    assert calls == [('spacing', True)]
+
+
+def test_cancel_everything_stops_the_timer(timers, scheduler):
+    calls = []
+    scheduler.request('align', recorder(calls, 'align'))
+    scheduler.request('spacing', recorder(calls, 'spacing'))
+
+    scheduler.cancel()
+
+    assert timers.registered == []
+    assert calls == []
+
+
+def test_flush_runs_pending_updates_as_final(timers, scheduler):
+    calls = []
+    scheduler.request('align', recorder(calls, 'align'))
+    timers.run()
+    scheduler.request('spacing', recorder(calls, 'spacing'))
+
+    scheduler.flush()
+
+    # align already ran with the latest request
+    assert calls == [('align', False), ('spacing', True)]
+
+
+def test_failing_update_does_not_stop_others(clock, timers, scheduler):
+    calls = []
+
+    def fail(final):
+        raise ValueError('object was removed')
+
+    scheduler.request('align', fail)
+    scheduler.request('spacing', recorder(calls, 'spacing'))
+
+    clock.now += 0.3
+    timers.run()
+
+    assert calls == [('spacing', True)]
@@ -0,0 +1,77 @@
+"""Renders preview images for every font in a folder that has none or an outdated one.
+
+Run from a shell with:
+
+    blender -b --factory-startup --python tools/render_previews.py -- <font dir> [--output <dir>] [--jobs <n>] [--sample <text>]
+
+Previews are written as <font name>.png to the output folder, the font
+folder by default, where the font loader pairs them with their fonts. For
+the fonts of the add-on itself use "styles --output previews" and rescan
+the fonts afterwards. Fonts are split over several Blender processes, each
+rendering its share in background mode.
+"""
+
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+
+import bpy
+
+addon_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, os.path.dirname(addon_dir))
+addon = importlib.import_module(os.path.basename(addon_dir))
+font_import = addon.font_import
+preview_renderer = addon.preview_renderer
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+
+    parser = argparse.ArgumentParser(prog='render_previews.py')
+    parser.add_argument('font_dir', help='folder with .blend font files, searched recursively')
+    parser.add_argument('--output', help='folder previews are written to, the font folder by default')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of Blender processes')
+    parser.add_argument('--sample', default=preview_renderer.SAMPLE_TEXT,
+                        help='text shown in the previews')
+    # fonts given to a worker process instead of a folder
+    parser.add_argument('--worker', nargs='*', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    if args.worker is not None:
+        rendered, skipped, failed = preview_renderer.render_missing(
+            args.worker, args.output, args.sample)
+        print(f'rendered {len(rendered)}, skipped {len(skipped)}, failed {len(failed)}')
+        return
+
+    output = args.output or args.font_dir
+    os.makedirs(output, exist_ok=True)
+
+    # fonts with an up to date preview are not sent to any worker
+    fonts = [f.font for f in font_import.scan_fonts(args.font_dir)]
+    todo = [font for font in fonts if preview_renderer.needs_preview(font, output)]
+    print(f'{len(fonts)} fonts, {len(todo)} need a preview')
+    if not todo:
+        return
+
+    jobs = max(1, min(args.jobs, len(todo)))
+    workers = []
+    for i in range(jobs):
+        command = [bpy.app.binary_path, '-b', '--factory-startup',
+                   '--python', os.path.realpath(__file__), '--',
+                   args.font_dir, '--output', output, '--sample', args.sample,
+                   '--worker'] + todo[i::jobs]
+        workers.append(subprocess.Popen(command))
+
+    failed = sum(1 for worker in workers if worker.wait() != 0)
+    if failed:
+        print(f'{failed} of {jobs} workers failed')
+
+
+main()
@@ -0,0 +1,114 @@
+"""Coalescing of expensive property updates.
+
+Dragging a slider fires its update callback many times a second. Callbacks
+hand their work to the scheduler instead of doing it, the scheduler runs
+only the latest request of every key at most once per interval from a
+bpy.app.timers timer. Once the requests have stopped for a moment, a
+request that has not run yet is run with final=True; one that already ran
+is not run again. Updates given an undo message push one undo step when
+they settle, so a whole drag is undone at once.
+"""
+
+import time
+
+
+class UpdateScheduler:
+    """Runs the latest requested update of every key at a fixed maximum rate.
+
+    interval - minimum time in seconds between two runs of the same key
+    settle - time in seconds without requests after which the final run happens
+    timers - registry the timer is registered with, bpy.app.timers by default
+    """
+
+    def __init__(self, interval=0.05, settle=0.25, timers=None):
+        self.interval = interval
+        self.settle = settle
+        self._timers = timers
+
+        # key -> [func, time of last request, not yet run, undo message]
+        self._pending = {}
+        # key -> time of last run
+        self._last_run = {}
+
+        # bound methods are new objects on every access, timers need the same one
+        self._timer = self._tick
+
+    @property
+    def timers(self):
+        # bpy is only imported when the scheduler is used inside blender
+        if self._timers is None:
+            import bpy
+            self._timers = bpy.app.timers
+        return self._timers
+
+    def request(self, key, func, undo=None):
+        """Schedules func(final) for key, replacing a request for key that has not run yet
+
+        undo - message of the undo step pushed after the final run, None for no undo step
+        """
+
+        self._pending[key] = [func, time.perf_counter(), True, undo]
+
+        if not self.timers.is_registered(self._timer):
+            self.timers.register(self._timer, first_interval=0)
+
+    def _run(self, key, func, final):
+        """Calls func(final), returns False if it failed"""
+
+        self._last_run[key] = time.perf_counter()
+        try:
+            func(final)
+        except Exception as e:
+            print(e)
+            return False
+        return True
+
+    def _settle(self, key, func, dirty, undo):
+        # the latest request already ran, only its undo step is left
+        if dirty and not self._run(key, func, True):
+            return
+
+        if undo is not None:
+            import bpy
+            bpy.ops.ed.undo_push(message=undo)
+
+    def _tick(self):
+        now = time.perf_counter()
+
+        for key, entry in list(self._pending.items()):
+            func, requested, dirty, undo = entry
+
+            if now - requested >= self.settle:
+                # requests stopped, the latest state is applied if it was not yet
+                del self._pending[key]
+                self._settle(key, func, dirty, undo)
+            elif dirty and now - self._last_run.get(key, 0) >= self.interval:
+                entry[2] = False
+                self._run(key, func, False)
+
+        # returning None stops the timer until the next request
+        return self.interval if self._pending else None
+
+    def flush(self):
+        """Settles all pending updates right away, running those that have not run yet as final"""
+
+        pending, self._pending = self._pending, {}
+        for key, (func, _, dirty, undo) in pending.items():
+            self._settle(key, func, dirty, undo)
+
+    def cancel(self, key=None):
+        """Drops the pending update of key without running it, or of every key if key is None"""
+
+        if key is not None:
+            self._pending.pop(key, None)
+            if self._pending:
+                return
+        else:
+            self._pending.clear()
+
+        if self.timers.is_registered(self._timer):
+            self.timers.unregister(self._timer)
+
+
+# shared by all property update callbacks of the add-on
+scheduler = UpdateScheduler()
@@ -0,0 +1,248 @@
+"""Creating and updating the collections of letter objects made by the text generator.
+
+A generated collection ("word") remembers the text and font it was made from
+in custom properties and every letter object remembers the index of its
+character in the text. This lets a word be updated in place when its text
+changes: letters before and after the edited part are kept and only the
+changed characters get new objects.
+"""
+
+import bpy
+import numpy as np
+
+TEXT_KEY = 'fontz_text'
+FONT_KEY = 'fontz_font'
+INDEX_KEY = 'fontz_index'
+
+def is_word(collection):
+    return collection is not None and TEXT_KEY in collection and FONT_KEY in collection
+
+
+def find_word(obj):
+    """Returns the generated collection obj belongs to, or None"""
+
+    if obj is None:
+        return None
+
+    for collection in obj.users_collection:
+        if is_word(collection):
+            return collection
+    return None
+
+
+def letter_objects(word):
+    """Returns dict mapping character index to letter object of a generated collection"""
+
+    return {obj[INDEX_KEY]: obj for obj in word.objects if INDEX_KEY in obj}
+
+
+def _new_letter(glyph, linked, index):
+    obj = glyph.copy()
+    # in linked mode every copy of a letter shares the mesh of the
+    # loaded glyph, otherwise each copy gets its own editable mesh
+    if not linked:
+        obj.data = glyph.data.copy()
+    obj.location = (0, 0, 0)
+    obj[INDEX_KEY] = index
+    return obj
+
+
+def _remove_letter(obj):
+    data = obj.data
+    bpy.data.objects.remove(obj)
+
+    # unlinked letters own a copy of the glyph's data, nothing else uses it
+    if data is not None and data.users == 0:
+        if isinstance(data, bpy.types.Mesh):
+            bpy.data.meshes.remove(data)
+        elif isinstance(data, bpy.types.Curve):
+            bpy.data.curves.remove(data)
+
+
+def build_word(text, font_name, glyphs, placement, linked):
+    """Creates a new collection holding a letter object for every placed character.
+
+    text - the generated text
+    font_name - the font the letters come from
+    glyphs - dict mapping letter to glyph object loaded from the font file
+    placement - (indices, xs, vs, axis) as laid out by glyph_layout
+    linked - share glyph meshes instead of copying them
+    """
+
+    # collection to house letters, named after the first line
+    word = bpy.data.collections.new(text.split('\n', 1)[0])
+    word[TEXT_KEY] = text
+    word[FONT_KEY] = font_name
+
+    indices, xs, vs, axis = placement
+    for index, x, v in zip(indices, xs, vs):
+        glyph = glyphs.get(text[index])
+        if glyph is None:
+            continue
+
+        obj = _new_letter(glyph, linked, index)
+        obj.location[0] = x
+        obj.location[axis] = v
+        word.objects.link(obj)
+
+    return word
+
+
+def update_word(word, text, font_name, glyphs, placement, linked):
+    """Updates a generated collection to show text, keeping letters that did not change.
+
+    The unchanged beginning and end of the old and new text are found first,
+    letters in between are removed and created again, letters after them are
+    renumbered, and all locations are then written at once, so letters
+    outside the edit are not visited one by one. Returns (added, removed)
+    letter counts.
+    """
+
+    old_text = word[TEXT_KEY]
+    if word[FONT_KEY] != font_name:
+        # every letter changes its glyph
+        old_text = ''
+
+    # length of the common beginning and the common end
+    limit = min(len(old_text), len(text))
+    prefix = 0
+    while prefix < limit and old_text[prefix] == text[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old_text[-1 - suffix] == text[-1 - suffix]:
+        suffix += 1
+
+    old_end = len(old_text) - suffix
+    new_end = len(text) - suffix
+    shift = new_end - old_end
+
+    letters = {}
+    removed = 0
+    for index, obj in letter_objects(word).items():
+        if index < prefix:
+            letters[index] = obj
+        elif index >= old_end and old_text:
+            letters[index + shift] = obj
+            if shift:
+                obj[INDEX_KEY] = index + shift
+        else:
+            _remove_letter(obj)
+            removed += 1
+
+    added = 0
+    indices, xs, vs, axis = placement
+    indices = np.asarray(indices)
+
+    # only characters of the edited part need new objects
+    first, last = np.searchsorted(indices, (prefix, new_end))
+    for index in indices[first:last].tolist():
+        if index in letters:
+            continue
+
+        glyph = glyphs.get(text[index])
+        if glyph is None:
+            continue
+
+        word.objects.link(_new_letter(glyph, linked, index))
+        added += 1
+
+    _move_letters(word, indices, np.asarray(xs), np.asarray(vs), axis)
+
+    word[TEXT_KEY] = text
+    word[FONT_KEY] = font_name
+    word.name = text.split('\n', 1)[0]
+
+    return added, removed
+
+
+def _char_indices(word):
+    """Returns the character index of every object of word in collection order, -1 for other objects"""
+
+    return np.array([obj.get(INDEX_KEY, -1) for obj in word.objects], dtype=np.int64)
+
+
+def _write_locations(objects, old, new):
+    """Writes all locations at once and tags the objects that moved for redraw"""
+
+    moved = np.nonzero((new != old).any(axis=1))[0]
+    if not len(moved):
+        return
+
+    objects.foreach_set('location', new.ravel())
+
+    # bulk writes skip property updates, so moved objects are tagged here
+    items = list(objects)
+    for i in moved.tolist():
+        items[i].update_tag(refresh={'OBJECT'})
+
+
+def _move_letters(word, indices, xs, vs, axis, keep_first=False):
+    """Moves the letters of word to the laid out locations with one bulk read and write.
+
+    keep_first - shift all letters so the first one stays where it is
+    """
+
+    objects = word.objects
+    count = len(objects)
+    order = _char_indices(word)
+    if not count or not len(indices):
+        return
+
+    # row of every object in the layout, objects without one are left alone
+    rows = np.minimum(np.searchsorted(indices, order), len(indices) - 1)
+    placed = (order >= 0) & (indices[rows] == order)
+    if not placed.any():
+        return
+    rows = rows[placed]
+
+    old = np.empty(count * 3)
+    objects.foreach_get('location', old)
+    old.shape = (count, 3)
+
+    new = old.copy()
+    new[placed, 0] = xs[rows]
+    new[placed, axis] = vs[rows]
+
+    if keep_first:
+        first = np.nonzero(placed)[0][np.argmin(order[placed])]
+        new[placed, 0] += old[first, 0] - new[first, 0]
+        new[placed, axis] += old[first, axis] - new[first, axis]
+
+    _write_locations(objects, old, new)
+
+
+def place_word(word, layout):
+    """Moves every letter of a generated collection to where layout puts it.
+
+    Locations are read and written for the whole collection at once. The
+    first letter stays where it is, so words that were moved keep their
+    place.
+
+    layout - glyph_layout.TextLayout for the font and options of the word
+    """
+
+    indices, xs, vs = layout.layout(word[TEXT_KEY])
+    _move_letters(word, indices, xs, vs, layout.table.vertical_axis, keep_first=True)
+
+
+def space_evenly(objects, spacing):
+    """Spreads objects at equal distances along the line from the first to the last one.
+
+    Used for collections that were not made by the text generator.
+    """
+
+    count = len(objects)
+    if count < 2:
+        return
+
+    old = np.empty(count * 3)
+    objects.foreach_get('location', old)
+    old.shape = (count, 3)
+
+    direction = old[-1] - old[0]
+    length = np.linalg.norm(direction)
+    if not length:
+        return
+
+    steps = np.arange(count)[:, None] * (spacing / length) * direction
+    _write_locations(objects, old, old[0] + steps)